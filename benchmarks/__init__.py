@@ -0,0 +1,7 @@
+"""
+Offline benchmarks for the voice action assistant.
+
+Run the speech to text suite with `python -m benchmarks` (see `benchmarks.stt`) and compare two
+result files with `python -m benchmarks.compare old.json new.json`. The other modules are
+micro-benchmarks for individual components and run with `python -m benchmarks.<name>`.
+"""
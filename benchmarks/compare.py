@@ -0,0 +1,66 @@
+"""
+Compare two `python -m benchmarks` result files.
+
+Usage: python -m benchmarks.compare baseline.json candidate.json [--threshold 0.1]
+
+Prints the relative change in warm p50/p95 latency, RTF and peak RSS per backend, acceleration
+mode and clip, plus the absolute WER change, and exits non-zero if any latency got worse by more
+than the threshold.
+"""
+
+import argparse
+import json
+import sys
+
+
+def index_runs(report: dict) -> dict:
+    return {(run["backend"], run["acceleration"]): run for run in report["runs"]}
+
+
+def relative_change(old: float, new: float) -> float:
+    return (new - old) / old if old else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    print(f"baseline {baseline.get('commit')} -> candidate {candidate.get('commit')}")
+
+    regressions = []
+    baseline_runs = index_runs(baseline)
+    for key, run in index_runs(candidate).items():
+        old_run = baseline_runs.get(key)
+        if old_run is None:
+            continue
+        rss_change = relative_change(old_run["peak_rss_mb"], run["peak_rss_mb"])
+        print(f"\n{key[0]} / {key[1]}: peak RSS {rss_change:+.1%}")
+        old_clips = {clip["clip"]: clip for clip in old_run["clips"]}
+        for clip in run["clips"]:
+            old_clip = old_clips.get(clip["clip"])
+            if old_clip is None:
+                continue
+            p50 = relative_change(old_clip["warm_p50_seconds"], clip["warm_p50_seconds"])
+            p95 = relative_change(old_clip["warm_p95_seconds"], clip["warm_p95_seconds"])
+            rtf = relative_change(old_clip["real_time_factor"], clip["real_time_factor"])
+            wer = ""
+            if clip["wer"] is not None and old_clip["wer"] is not None:
+                wer = f" | WER {clip['wer'] - old_clip['wer']:+.1%}"
+            print(f"  {clip['clip']:<8} | p50 {p50:+.1%} | p95 {p95:+.1%} | RTF {rtf:+.1%}{wer}")
+            if p50 > args.threshold:
+                regressions.append((key, clip["clip"], p50))
+
+    if regressions:
+        print(f"\n{len(regressions)} latency regressions above {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
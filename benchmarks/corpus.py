@@ -0,0 +1,86 @@
+"""
+Fixed benchmark corpus at the lengths the assistant actually sees.
+
+If a corpus directory with reference transcripts is given (`clip.wav` + `clip.txt`), each length
+is built by concatenating its clips in sorted order, rounded up to whole clips so the reference
+stays exact and WER can be measured. Otherwise a deterministic speech-like signal (voiced
+syllables with pauses) is synthesized, which exercises latency and resource use but has no
+reference transcript.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from scipy.io import wavfile
+
+SAMPLE_RATE = 16000
+LENGTHS = {"wake_1s": 1, "30s": 30, "5min": 300, "30min": 1800}
+
+
+@dataclass
+class Clip:
+    name: str
+    audio: np.ndarray
+    reference: str | None
+
+    @property
+    def seconds(self) -> float:
+        return len(self.audio) / SAMPLE_RATE
+
+
+def synthesize_speech_like(seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    audio = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    position = 0
+    while position < len(audio):
+        # A syllable: a few harmonics of a gliding pitch under a smooth envelope
+        length = int(rng.uniform(0.12, 0.3) * SAMPLE_RATE)
+        t = np.arange(length) / SAMPLE_RATE
+        pitch = rng.uniform(100, 220) * (1 + 0.1 * t)
+        syllable = sum(np.sin(2 * np.pi * k * pitch * t) / k for k in range(1, 6))
+        syllable *= np.hanning(length) * rng.uniform(0.05, 0.2)
+        end = min(position + length, len(audio))
+        audio[position:end] = syllable[: end - position]
+        # Short gaps between syllables, occasionally a longer pause between phrases
+        position = end + int(rng.choice([0.05, 0.08, 0.6], p=[0.6, 0.3, 0.1]) * SAMPLE_RATE)
+    audio += rng.normal(0, 0.002, len(audio)).astype(np.float32)
+    return audio
+
+
+def load_wav(path: Path) -> np.ndarray:
+    rate, data = wavfile.read(path)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if np.issubdtype(data.dtype, np.integer):
+        data = data / np.iinfo(data.dtype).max
+    if rate != SAMPLE_RATE:
+        from scipy.signal import resample_poly
+
+        data = resample_poly(data, SAMPLE_RATE, rate)
+    return data.astype(np.float32)
+
+
+def load_corpus(lengths: list[str], corpus_dir: str | None = None) -> list[Clip]:
+    sources = []
+    if corpus_dir:
+        for reference_path in sorted(Path(corpus_dir).glob("*.txt")):
+            wav_path = reference_path.with_suffix(".wav")
+            if wav_path.exists():
+                sources.append((load_wav(wav_path), reference_path.read_text().strip()))
+
+    clips = []
+    for name in lengths:
+        n_samples = LENGTHS[name] * SAMPLE_RATE
+        if not sources:
+            clips.append(Clip(name, synthesize_speech_like(LENGTHS[name]), None))
+            continue
+        # Whole clips only, so the reference transcript stays exact
+        parts, references, index = [], [], 0
+        while sum(len(part) for part in parts) < n_samples:
+            audio, reference = sources[index % len(sources)]
+            parts.append(audio)
+            references.append(reference)
+            index += 1
+        clips.append(Clip(name, np.concatenate(parts), " ".join(references)))
+    return clips
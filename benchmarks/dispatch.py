@@ -0,0 +1,70 @@
+"""
+Per-transcript dispatch cost of the legacy per-action regex loop vs PhraseMatcher.
+
+Usage: python -m benchmarks.dispatch
+"""
+
+import re
+import statistics
+from time import perf_counter
+
+from voice_action_assistant.matcher import PhraseMatcher, PhraseRole
+
+ACTION_COUNTS = [3, 10, 100, 500]
+TRANSCRIPTS = [
+    "so i was thinking about the weather today",
+    "okay hi computer",
+    "and that is everything for the ticket see ya",
+    "",
+]
+
+
+def legacy_contains_phrase(transcript, phrase):
+    # Mirrors the old create_regex_pattern + re.search path, which rebuilt the pattern every call
+    pattern = r"[^\w]*".join(map(re.escape, phrase.split())) + r"[^\w]*$"
+    return re.search(pattern, transcript, flags=re.IGNORECASE) is not None
+
+
+def make_actions(n_actions: int) -> list[tuple[str, str, str]]:
+    actions = [("General Purpose LLM", "hi computer", "see ya")]
+    actions += [
+        (f"action {i}", f"start task number {i}", f"finish task {i}") for i in range(1, n_actions)
+    ]
+    return actions
+
+
+def bench(dispatch, repeats: int = 200) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = perf_counter()
+        for transcript in TRANSCRIPTS:
+            dispatch(transcript)
+        timings.append((perf_counter() - start) / len(TRANSCRIPTS))
+    return statistics.median(timings)
+
+
+def main():
+    print(f"{'actions':>8} | {'legacy us':>10} | {'matcher us':>10} | speedup")
+    for n_actions in ACTION_COUNTS:
+        actions = make_actions(n_actions)
+
+        def legacy_dispatch(transcript):
+            return [
+                (name, role)
+                for name, start_phrase, stop_phrase in actions
+                for role, phrase in (("start", start_phrase), ("stop", stop_phrase))
+                if legacy_contains_phrase(transcript, phrase)
+            ]
+
+        matcher = PhraseMatcher()
+        for name, start_phrase, stop_phrase in actions:
+            matcher.add(name, PhraseRole.START, start_phrase)
+            matcher.add(name, PhraseRole.STOP, stop_phrase)
+
+        legacy = bench(legacy_dispatch) * 1e6
+        compiled = bench(matcher.match) * 1e6
+        print(f"{n_actions:>8} | {legacy:>10.1f} | {compiled:>10.2f} | {legacy / compiled:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
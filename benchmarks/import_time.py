@@ -0,0 +1,80 @@
+"""
+Guard the import time of the `va` entry point.
+
+Usage: python -m benchmarks.import_time [--budget-ms 1000] [--top 10]
+
+Imports `voice_action_assistant.main` in a fresh interpreter with `python -X importtime` and
+fails (exit code 1) if it takes longer than the budget or pulls in one of the heavy dependencies
+that must only be imported on first use. tests/test_import_time.py runs the same check with
+pytest; the subcommands such as `va settings` stay fast only as long as it passes.
+"""
+
+import argparse
+import subprocess
+import sys
+
+ENTRY_MODULE = "voice_action_assistant.main"
+IMPORT_BUDGET_MS = 1000.0
+
+# Deferred to first use, importing any of these at startup is a regression
+DEFERRED_MODULES = [
+    "torch",
+    "transformers",
+    "pygame",
+    "pyautogui",
+    "openai",
+    "httpx",
+    "pydub",
+    "sounddevice",
+    "scipy.signal",
+]
+
+
+def measure_imports(module: str) -> dict[str, tuple[int, int]]:
+    """Return {module: (self_us, cumulative_us)} from a fresh `python -X importtime` run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            continue  # The header line
+        imports[name.strip()] = (int(self_us), int(cumulative_us))
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to print")
+    args = parser.parse_args()
+
+    imports = measure_imports(ENTRY_MODULE)
+    total_ms = imports[ENTRY_MODULE][1] / 1000
+
+    print(f"{ENTRY_MODULE} imported in {total_ms:0.0f} ms (budget {args.budget_ms:0.0f} ms)")
+    print("Slowest imports by self time:")
+    slowest = sorted(imports.items(), key=lambda item: item[1][0], reverse=True)
+    for name, (self_us, _) in slowest[: args.top]:
+        print(f"  {self_us / 1000:>7.1f} ms  {name}")
+
+    failures = [f"{name} is imported at startup" for name in DEFERRED_MODULES if name in imports]
+    if total_ms > args.budget_ms:
+        failures.append(
+            f"import took {total_ms:0.0f} ms, over the {args.budget_ms:0.0f} ms budget"
+        )
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Time to first token with a fresh OpenAI client per call vs the shared pooled client.
+
+Usage: python -m benchmarks.llm_client [--requests 50] [--base-url URL]
+
+By default requests go to the local stand-in server (benchmarks.openai_stub). Over plain HTTP on
+localhost only the TCP connect is saved; pass --base-url of a real HTTPS endpoint (with
+OPENAI_API_KEY set) to include the TLS handshake.
+"""
+
+import argparse
+import os
+from time import perf_counter
+
+from openai import OpenAI
+
+from benchmarks.openai_stub import base_url, start_stub_server
+from benchmarks.stats import percentiles
+from voice_action_assistant.config import config
+from voice_action_assistant.llm_client import OpenAIClientManager
+
+
+def time_to_first_token(client: OpenAI, model: str) -> float:
+    start = perf_counter()
+    stream = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": "Say hi"}],
+        max_tokens=16,
+        stream=True,
+    )
+    first_token = None
+    for chunk in stream:
+        if first_token is None and chunk.choices and chunk.choices[0].delta.content:
+            first_token = perf_counter() - start
+    return first_token if first_token is not None else perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--base-url")
+    parser.add_argument("--model", default=config.MODEL_ID)
+    args = parser.parse_args()
+
+    if args.base_url:
+        url = args.base_url
+    else:
+        url = base_url(start_stub_server())
+        os.environ.setdefault("OPENAI_API_KEY", "stub")
+    config.OPENAI_BASE_URL = url
+
+    fresh = []
+    for _ in range(args.requests):
+        # The old init_client() behaviour: a new client and connection pool for every call
+        with OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=url) as client:
+            fresh.append(time_to_first_token(client, args.model))
+    manager = OpenAIClientManager()
+    pooled = [time_to_first_token(manager.get(), args.model) for _ in range(args.requests)]
+    manager.close()
+
+    print(f"{'client':<22} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7}")
+    for name, timings in (("fresh client per call", fresh), ("shared pooled client", pooled)):
+        stats = percentiles(timings)
+        print(
+            f"{name:<22} | {stats['p50'] * 1e3:>7.2f} | {stats['p95'] * 1e3:>7.2f} | "
+            f"{stats['p99'] * 1e3:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
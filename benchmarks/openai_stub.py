@@ -0,0 +1,180 @@
+"""
+Local stand-in for the OpenAI endpoints the assistant uses.
+
+Implements streaming and non-streaming chat completions, text to speech (wav or raw 24 kHz pcm),
+transcriptions and the model list, with configurable latencies. Point the assistant at it with
+`OPENAI_BASE_URL: "http://127.0.0.1:8765/v1"` or start it in-process with `start_stub_server()`.
+
+Usage: python -m benchmarks.openai_stub [--port 8765] [--first-token-delay 0.2]
+"""
+
+import argparse
+import io
+import json
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from scipy.io import wavfile
+
+SPEECH_SAMPLE_RATE = 24000  # The rate of OpenAI's raw pcm output
+DEFAULT_RESPONSE = (
+    "Sure. Here is a short answer to your question. "
+    "```python\nprint('hello world')\n```\n"
+    "That prints a greeting. Let me know if you need anything else."
+)
+
+
+@dataclass
+class StubSettings:
+    response: str = DEFAULT_RESPONSE
+    first_token_delay: float = 0.0
+    token_delay: float = 0.0
+    speech_delay: float = 0.0
+    speech_seconds_per_char: float = 0.06
+    transcript: str = "hello world"
+
+
+def tokenize(text: str) -> list[str]:
+    # Roughly word sized deltas, keeping whitespace attached like real tokens
+    tokens, current = [], ""
+    for char in text:
+        current += char
+        if char in " \n":
+            tokens.append(current)
+            current = ""
+    return tokens + ([current] if current else [])
+
+
+def synthesize_speech(text: str, seconds_per_char: float) -> np.ndarray:
+    n_samples = max(1, int(len(text) * seconds_per_char * SPEECH_SAMPLE_RATE))
+    t = np.arange(n_samples) / SPEECH_SAMPLE_RATE
+    tone = 0.2 * np.sin(2 * np.pi * 180 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+    return (tone * (2**15 - 1)).astype(np.int16)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+    settings = StubSettings()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _send(self, body: bytes, content_type: str, status: int = 200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload: dict):
+        self._send(json.dumps(payload).encode(), "application/json")
+
+    def do_GET(self):
+        if self.path.endswith("/models"):
+            self._send_json({"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        else:
+            self._send(b"not found", "text/plain", 404)
+
+    def do_POST(self):
+        if self.path.endswith("/chat/completions"):
+            self._chat_completions(json.loads(self._read_body()))
+        elif self.path.endswith("/audio/speech"):
+            self._speech(json.loads(self._read_body()))
+        elif self.path.endswith("/audio/transcriptions"):
+            self._read_body()
+            self._send_json({"text": self.settings.transcript})
+        else:
+            self._read_body()
+            self._send(b"not found", "text/plain", 404)
+
+    def _chat_completions(self, request: dict):
+        settings = self.settings
+        time.sleep(settings.first_token_delay)
+        base = {"id": "chatcmpl-stub", "created": int(time.time()), "model": request["model"]}
+        if not request.get("stream"):
+            message = {"role": "assistant", "content": settings.response}
+            choice = {"index": 0, "message": message, "finish_reason": "stop"}
+            self._send_json({**base, "object": "chat.completion", "choices": [choice]})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index, token in enumerate(tokenize(settings.response)):
+            if index:
+                time.sleep(settings.token_delay)
+            choice = {"index": 0, "delta": {"content": token}, "finish_reason": None}
+            chunk = {**base, "object": "chat.completion.chunk", "choices": [choice]}
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _speech(self, request: dict):
+        time.sleep(self.settings.speech_delay)
+        audio = synthesize_speech(request["input"], self.settings.speech_seconds_per_char)
+        if request.get("response_format") == "pcm":
+            self._send(audio.tobytes(), "audio/pcm")
+            return
+        # wav for everything else; the stub has no mp3 encoder
+        wav_file = io.BytesIO()
+        wavfile.write(wav_file, SPEECH_SAMPLE_RATE, audio)
+        self._send(wav_file.getvalue(), "audio/wav")
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping idle keep-alive connections is expected, not an error
+        pass
+
+
+def start_stub_server(settings: StubSettings | None = None, port: int = 0) -> StubServer:
+    """Start the stub on a background thread; its base URL is `base_url(server)`."""
+    handler = type(
+        "ConfiguredStubHandler", (StubHandler,), {"settings": settings or StubSettings()}
+    )
+    server = StubServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server: StubServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first-token-delay", type=float, default=0.0)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--speech-delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    settings = StubSettings(
+        first_token_delay=args.first_token_delay,
+        token_delay=args.token_delay,
+        speech_delay=args.speech_delay,
+    )
+    server = start_stub_server(settings, args.port)
+    print(f"OpenAI stub listening on {base_url(server)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
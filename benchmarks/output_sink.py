@@ -0,0 +1,85 @@
+"""
+Per-token overhead of writing a streamed LLM response, legacy file handling vs StreamingOutputSink.
+
+Usage: python -m benchmarks.output_sink [--tokens 4000]
+
+Legacy mirrors the old code: reopening live_response.md for every delta and, in
+llm_post_process_transcript, appending the whole accumulated response to output.txt per delta.
+Console and clipboard targets are left out so only the file handling is measured.
+"""
+
+import argparse
+import os
+import tempfile
+from time import perf_counter
+
+from voice_action_assistant.output_sink import FileTarget, StreamingOutputSink
+
+
+def make_tokens(n_tokens: int) -> list[str]:
+    words = ["the ", "model ", "streams ", "tokens ", "like ", "this, ", "```", "\n"]
+    return [words[i % len(words)] for i in range(n_tokens)]
+
+
+def legacy_live_file(tokens: list[str], directory: str):
+    path = os.path.join(directory, "live_response.md")
+    with open(path, "w") as f:
+        f.write("# LLM RESPONSE\n\n")
+    for token in tokens:
+        with open(path, "a") as f:
+            f.write(token)
+
+
+def legacy_transcript_log(tokens: list[str], directory: str):
+    path = os.path.join(directory, "output.txt")
+    response_text = ""
+    with open(path, "a") as f:
+        f.write("\nLLM output:\n")
+    for token in tokens:
+        response_text += token
+        with open(path, "a") as f:
+            f.write(f"{response_text}")
+
+
+def sink_live_file_and_log(tokens: list[str], directory: str):
+    targets = [
+        FileTarget(os.path.join(directory, "live_response.md"), "w", "# LLM RESPONSE\n\n"),
+        FileTarget(os.path.join(directory, "output.txt"), header="\nLLM output:\n"),
+    ]
+    with StreamingOutputSink(targets) as sink:
+        for token in tokens:
+            sink.write(token)
+
+
+def measure(write_stream, tokens: list[str]) -> tuple[float, int]:
+    with tempfile.TemporaryDirectory() as directory:
+        start = perf_counter()
+        write_stream(tokens, directory)
+        elapsed = perf_counter() - start
+        written = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+    return elapsed / len(tokens), written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=4000)
+    args = parser.parse_args()
+    tokens = make_tokens(args.tokens)
+
+    def legacy_both(tokens, directory):
+        legacy_live_file(tokens, directory)
+        legacy_transcript_log(tokens, directory)
+
+    print(f"{'path':<40} | {'us/token':>9} | bytes written")
+    for name, write_stream in (
+        ("legacy live_response.md", legacy_live_file),
+        ("legacy output.txt (post-process)", legacy_transcript_log),
+        ("legacy both", legacy_both),
+        ("StreamingOutputSink both", sink_live_file_and_log),
+    ):
+        per_token, written = measure(write_stream, tokens)
+        print(f"{name:<40} | {per_token * 1e6:>9.2f} | {written:,}")
+
+
+if __name__ == "__main__":
+    main()
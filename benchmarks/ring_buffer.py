@@ -0,0 +1,100 @@
+"""
+Compare the legacy per-sample deque with AudioRingBuffer.
+
+Usage: python -m benchmarks.ring_buffer [--max-deque-seconds 60]
+
+The deque stores one ndarray row per sample, so filling it for an hour needs several GB of RAM.
+Durations above --max-deque-seconds are extrapolated linearly from the largest measured deque.
+"""
+
+import argparse
+import statistics
+import tracemalloc
+from collections import deque
+from time import perf_counter
+
+import numpy as np
+
+from voice_action_assistant.audio_buffer import AudioRingBuffer
+
+FS = 16000
+BLOCK_SIZE = 512  # Typical sounddevice callback size
+WAKE_WINDOW_SECONDS = 3
+DURATIONS = [3, 60, 3600]
+
+
+def fill(write, n_samples: int):
+    block = np.random.default_rng(0).random((BLOCK_SIZE, 1), dtype=np.float32)
+    for _ in range(n_samples // BLOCK_SIZE):
+        write(block)
+
+
+def time_reads(read, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = perf_counter()
+        read()
+        timings.append(perf_counter() - start)
+    return statistics.median(timings)
+
+
+def bench_deque(seconds: int) -> dict:
+    n_samples = seconds * FS
+    tracemalloc.start()
+    queue = deque(maxlen=n_samples)
+    fill(lambda block: queue.extend(block.copy()), n_samples)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    window = WAKE_WINDOW_SECONDS * FS
+    return {
+        "memory_mb": memory / 1e6,
+        "snapshot_ms": time_reads(lambda: np.concatenate(list(queue)).flatten()) * 1e3,
+        "latest_ms": time_reads(lambda: np.concatenate(list(queue)).flatten()[-window:]) * 1e3,
+    }
+
+
+def bench_ring_buffer(seconds: int) -> dict:
+    n_samples = seconds * FS
+    tracemalloc.start()
+    buffer = AudioRingBuffer(n_samples)
+    fill(lambda block: buffer.write(block[:, 0]), n_samples)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    window = WAKE_WINDOW_SECONDS * FS
+    return {
+        "memory_mb": memory / 1e6,
+        "snapshot_ms": time_reads(buffer.snapshot) * 1e3,
+        "latest_ms": time_reads(lambda: buffer.latest(window)) * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-deque-seconds", type=int, default=60)
+    args = parser.parse_args()
+
+    print(
+        f"{'seconds':>8} | {'impl':<12} | {'memory MB':>10} | {'snapshot ms':>12} | latest 3s ms"
+    )
+    measured = {}
+    for seconds in DURATIONS:
+        if seconds <= args.max_deque_seconds:
+            measured = bench_deque(seconds)
+            measured_seconds = seconds
+            legacy, impl = measured, "deque"
+        else:
+            scale = seconds / measured_seconds
+            legacy = {key: value * scale for key, value in measured.items()}
+            impl = "deque (est)"
+        ring = bench_ring_buffer(seconds)
+        for name, result in ((impl, legacy), ("ring buffer", ring)):
+            print(
+                f"{seconds:>8} | {name:<12} | {result['memory_mb']:>10.1f} | "
+                f"{result['snapshot_ms']:>12.3f} | {result['latest_ms']:.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Latency of the local settings command parser and the share of commands it resolves.
+
+Usage: python -m benchmarks.settings_parser [--repeats 1000]
+
+Each command is parsed `--repeats` times; commands the parser returns None for would be sent
+to the LLM by `AssistantSettingsAction`. Only settings that apply while running are resolved
+locally, so "streaming transcription" (read when the actions are built) goes to the LLM.
+"""
+
+import argparse
+import time
+
+from voice_action_assistant.settings_parser import SettingsCommandParser
+
+COMMANDS = [
+    "Disable clipboard.",
+    "Enable the clipboard.",
+    "Set audio speed to 1.5.",
+    "Show settings.",
+    "What are my current settings?",
+    "Turn on text to speech.",
+    "Enable TTS.",
+    "Disable code block extraction.",
+    "Set the model ID to gpt-4o.",
+    "Set copy to clipboard to false.",
+    "Disable copy to clipboard.",
+    "Set recording format to opus.",
+    "Set TTS voice to nova.",
+    "Enable the LLM cache.",
+    "Enable paste at cursor.",
+    "Turn off streaming transcription.",
+    "Set audio files dir to none.",
+    "Set maximum audio length to ten minutes.",
+    "Make the voice a bit faster.",
+    "Talk slower.",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=1000)
+    args = parser.parse_args()
+
+    settings_parser = SettingsCommandParser()
+    print(f"{'command':<42} | {'us':>6} | result")
+    for command in COMMANDS:
+        start_time = time.perf_counter()
+        for _ in range(args.repeats):
+            result = settings_parser.parse(command)
+        microseconds = (time.perf_counter() - start_time) / args.repeats * 1e6
+        settings_parser.fast_path += result is not None
+        settings_parser.fallbacks += result is None
+        outcome = "LLM fallback" if result is None else ("view" if result.view else result.updates)
+        print(f"{command:<42} | {microseconds:>6.1f} | {outcome}")
+    print(f"Resolved locally: {settings_parser.report()}")
+
+
+if __name__ == "__main__":
+    main()
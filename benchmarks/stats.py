@@ -0,0 +1,27 @@
+import re
+
+import numpy as np
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    return {
+        f"p{q}": float(np.percentile(values, q)) if values else float("nan") for q in (50, 95, 99)
+    }
+
+
+def normalize_words(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    if not ref:
+        return float(bool(hyp))
+    distances = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        previous_diagonal, distances[0] = distances[0], i
+        for j, hyp_word in enumerate(hyp, start=1):
+            substitution = previous_diagonal + (ref_word != hyp_word)
+            previous_diagonal = distances[j]
+            distances[j] = min(distances[j] + 1, distances[j - 1] + 1, substitution)
+    return distances[-1] / len(ref)
@@ -0,0 +1,216 @@
+"""
+Speech to text benchmark across backends and acceleration modes.
+
+Usage:
+    python -m benchmarks --backends fake transformers --acceleration none int8 int8+sdpa \
+        --lengths wake_1s 30s 5min --corpus-dir path/to/clips --output results.json
+
+A backend can be given as `name@model_id` to override STT_MODEL_ID, e.g. to compare assisted
+decoding against its main model on its own:
+    python -m benchmarks --backends transformers@openai/whisper-large-v3 assisted \
+        --lengths 30s 5min --corpus-dir path/to/clips
+
+Each backend/acceleration combination runs in a fresh process, so cold latency includes model
+loading and peak RSS is not shared between runs. Per clip it reports cold latency (first call),
+warm p50/p95/p99 latency, real-time factor, CPU time and WER when references exist, and each
+acceleration mode's RTF and WER deltas against the same backend's `none` run. Hugging Face
+downloads are disabled, so transformers/onnx models must already be in the local cache.
+
+Without `--corpus-dir` the clips are synthetic audio of exactly the named length. With it, clips
+are concatenated whole until they reach the length, so their references stay exact; a length
+rounds up to whole clips, e.g. "wake_1s" is the first clip even if that is several seconds long.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.corpus import LENGTHS, load_corpus
+from benchmarks.stats import percentiles, word_error_rate
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def run_configuration(
+    backend_spec: str,
+    acceleration: list[str],
+    lengths: list[str],
+    corpus_dir: str | None,
+    repeats: int,
+    fake_real_time_factor: float,
+) -> dict:
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+    from voice_action_assistant.config import config
+    from voice_action_assistant.stt_backends import create_backend
+
+    backend_name, _, model_id = backend_spec.partition("@")
+    if model_id:
+        config.STT_MODEL_ID = model_id
+    config.STT_ACCELERATION = acceleration
+    config.STT_FAKE_REAL_TIME_FACTOR = fake_real_time_factor
+    clips = load_corpus(lengths, corpus_dir)
+
+    start = time.perf_counter()
+    backend = create_backend(backend_name)
+    load_seconds = time.perf_counter() - start
+
+    results = []
+    for clip in clips:
+        latencies, cpu_times = [], []
+        hypothesis = ""
+        for _ in range(repeats + 1):
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            hypothesis = backend.transcribe(clip.audio)
+            latencies.append(time.perf_counter() - wall_start)
+            cpu_times.append(time.process_time() - cpu_start)
+
+        cold, warm = latencies[0], latencies[1:]
+        warm_percentiles = percentiles(warm)
+        results.append(
+            {
+                "clip": clip.name,
+                "audio_seconds": clip.seconds,
+                "cold_seconds": cold,
+                **{f"warm_{key}_seconds": value for key, value in warm_percentiles.items()},
+                "real_time_factor": warm_percentiles["p50"] / clip.seconds,
+                "cpu_seconds": sum(cpu_times[1:]) / len(cpu_times[1:]),
+                "wer": word_error_rate(clip.reference, hypothesis) if clip.reference else None,
+            }
+        )
+
+    return {
+        "backend": backend_spec,
+        "acceleration": "+".join(acceleration) or "none",
+        "load_seconds": load_seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "clips": results,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(run: dict):
+    print(
+        f"\n{run['backend']} / {run['acceleration']}: "
+        f"load {run['load_seconds']:.2f} s, peak RSS {run['peak_rss_mb']:.0f} MB"
+    )
+    print(
+        f"  {'clip':<8} | {'cold s':>7} | {'p50 s':>7} | {'p95 s':>7} | {'p99 s':>7} | "
+        f"{'RTF':>6} | {'CPU s':>7} | WER"
+    )
+    for clip in run["clips"]:
+        wer = f"{clip['wer']:.1%}" if clip["wer"] is not None else "n/a"
+        print(
+            f"  {clip['clip']:<8} | {clip['cold_seconds']:>7.3f} | "
+            f"{clip['warm_p50_seconds']:>7.3f} | {clip['warm_p95_seconds']:>7.3f} | "
+            f"{clip['warm_p99_seconds']:>7.3f} | {clip['real_time_factor']:>6.3f} | "
+            f"{clip['cpu_seconds']:>7.2f} | {wer}"
+        )
+
+
+def print_deltas(runs: list[dict]):
+    """RTF and WER of each acceleration mode relative to the backend's float32 (`none`) run."""
+    baselines = {run["backend"]: run for run in runs if run["acceleration"] == "none"}
+    accelerated = [
+        run for run in runs if run["acceleration"] != "none" and run["backend"] in baselines
+    ]
+    if not accelerated:
+        return
+    print(f"\n  {'backend / modes':<32} | {'clip':<8} | {'RTF delta':>9} | WER delta")
+    for run in accelerated:
+        baseline_clips = {clip["clip"]: clip for clip in baselines[run["backend"]]["clips"]}
+        for clip in run["clips"]:
+            baseline = baseline_clips.get(clip["clip"])
+            if baseline is None:
+                continue
+            rtf_delta = clip["real_time_factor"] / baseline["real_time_factor"] - 1
+            wer_delta = (
+                f"{clip['wer'] - baseline['wer']:+.1%}"
+                if clip["wer"] is not None and baseline["wer"] is not None
+                else "n/a"
+            )
+            label = f"{run['backend']} / {run['acceleration']}"
+            print(f"  {label:<32} | {clip['clip']:<8} | {rtf_delta:>+9.0%} | {wer_delta}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--backends", nargs="+", default=["fake"])
+    parser.add_argument(
+        "--acceleration",
+        nargs="+",
+        default=["none"],
+        help="STT_ACCELERATION combinations, e.g. none int8 int8+sdpa (transformers only)",
+    )
+    parser.add_argument("--lengths", nargs="+", default=list(LENGTHS), choices=list(LENGTHS))
+    parser.add_argument("--corpus-dir", help="Directory of clip.wav + clip.txt references")
+    parser.add_argument("--repeats", type=int, default=5, help="Warm runs per clip")
+    parser.add_argument(
+        "--fake-real-time-factor",
+        type=float,
+        default=0.01,
+        help="Simulated compute cost of the fake backend",
+    )
+    parser.add_argument("--output", default="stt_benchmark.json")
+    args = parser.parse_args()
+
+    configurations = []
+    for backend_name in args.backends:
+        modes = args.acceleration if backend_name.startswith("transformers") else ["none"]
+        for mode in modes:
+            acceleration = [] if mode == "none" else mode.split("+")
+            configurations.append((backend_name, acceleration))
+
+    runs = []
+    context = multiprocessing.get_context("spawn")
+    for backend_name, acceleration in configurations:
+        with context.Pool(1) as pool:
+            run = pool.apply(
+                run_configuration,
+                (
+                    backend_name,
+                    acceleration,
+                    args.lengths,
+                    args.corpus_dir,
+                    args.repeats,
+                    args.fake_real_time_factor,
+                ),
+            )
+        print_summary(run)
+        runs.append(run)
+    print_deltas(runs)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "runs": runs,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
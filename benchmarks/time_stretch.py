@@ -0,0 +1,94 @@
+"""
+Processing time per minute of speech to play TTS audio at AUDIO_SPEED.
+
+Usage: python -m benchmarks.time_stretch [--seconds 60] [--speed 1.25] [--repeats 3]
+
+Compares the old file path (decode the mp3, pydub speedup, encode the mp3 again, decode it for
+playback), pydub speedup on in-memory pcm, and the in-memory WSOLA `time_stretch`. The pydub
+paths are skipped when pydub or ffmpeg is not installed.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.corpus import SAMPLE_RATE, synthesize_speech_like
+from voice_action_assistant.audio_dsp import time_stretch
+from voice_action_assistant.tts import SPEECH_SAMPLE_RATE
+
+
+def speech_pcm(seconds: float) -> np.ndarray:
+    audio = synthesize_speech_like(seconds)
+    # The corpus is 16 kHz; TTS pcm is 24 kHz
+    positions = np.arange(int(len(audio) * SPEECH_SAMPLE_RATE / SAMPLE_RATE))
+    audio = np.interp(positions * SAMPLE_RATE / SPEECH_SAMPLE_RATE, np.arange(len(audio)), audio)
+    return (np.clip(audio, -1, 1) * (2**15 - 1)).astype(np.int16)
+
+
+def to_segment(audio: np.ndarray):
+    from pydub import AudioSegment
+
+    return AudioSegment(
+        data=audio.tobytes(), sample_width=2, frame_rate=SPEECH_SAMPLE_RATE, channels=1
+    )
+
+
+def mp3_round_trip(audio: np.ndarray, speed: float, directory: str) -> float:
+    from pydub import AudioSegment
+
+    file_name = os.path.join(directory, "response.mp3")
+    to_segment(audio).export(file_name, format="mp3")  # What the speech endpoint returned
+    start_time = time.perf_counter()
+    sound = AudioSegment.from_file(file_name)
+    sound.speedup(playback_speed=speed).export(file_name, format="mp3")
+    AudioSegment.from_file(file_name).raw_data  # What mixer.music.load decoded again
+    return time.perf_counter() - start_time
+
+
+def pydub_in_memory(audio: np.ndarray, speed: float, directory: str) -> float:
+    start_time = time.perf_counter()
+    np.frombuffer(to_segment(audio).speedup(playback_speed=speed).raw_data, dtype=np.int16)
+    return time.perf_counter() - start_time
+
+
+def wsola(audio: np.ndarray, speed: float, directory: str) -> float:
+    start_time = time.perf_counter()
+    time_stretch(audio, SPEECH_SAMPLE_RATE, speed)
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--speed", type=float, default=1.25)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    audio = speech_pcm(args.seconds)
+    try:
+        import pydub  # noqa: F401
+
+        has_pydub = shutil.which("ffmpeg") is not None
+    except ImportError:
+        has_pydub = False
+
+    paths = [("mp3 round trip", mp3_round_trip), ("pydub in memory", pydub_in_memory)]
+    if not has_pydub:
+        print("pydub or ffmpeg not installed, only timing time_stretch")
+        paths = []
+    paths.append(("wsola time_stretch", wsola))
+
+    print(f"{args.seconds:.0f} s of 24 kHz speech at {args.speed}x")
+    print(f"{'path':<20} | {'s per minute':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, run in paths:
+            seconds = min(run(audio, args.speed, directory) for _ in range(args.repeats))
+            print(f"{name:<20} | {seconds * 60 / args.seconds:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Time to first audio of a spoken LLM answer: whole response then speech vs sentence streaming.
+
+Usage: python -m benchmarks.tts [--runs 5] [--token-delay 0.03] [--speech-delay 0.3]
+
+Runs against the local stand-in server (benchmarks.openai_stub) with simulated model and speech
+latencies. Playback is simulated in real time, so the numbers include waiting for the speaker,
+and "gaps" is the silence between segments when synthesis could not keep up.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.openai_stub import StubSettings, base_url, start_stub_server
+from benchmarks.stats import percentiles
+from voice_action_assistant.config import config
+from voice_action_assistant.llm_client import client_manager, get_client, stream_text
+from voice_action_assistant.tts import SPEECH_SAMPLE_RATE, StreamingSpeaker
+
+RESPONSE = (
+    "Good question. The short answer is that it depends on how often the data changes. "
+    "If it changes rarely, cache it in memory and refresh it on a timer. "
+    "If it changes often, read it on demand and keep a small LRU in front of it. "
+    "Either way, measure the hit rate before you tune anything else. "
+    "```python\n@lru_cache(maxsize=128)\ndef load(key): ...\n```\n"
+    "That decorator is usually all you need to start with."
+)
+
+
+class SimulatedPlayer:
+    """Keeps the clock of real-time playback without a sound card."""
+
+    def __init__(self):
+        self.playing_until: float | None = None
+        self.gap_seconds = 0.0
+
+    def enqueue(self, audio: np.ndarray, sample_rate: int):
+        now = time.perf_counter()
+        if self.playing_until is None:
+            self.playing_until = now
+        elif now > self.playing_until:
+            self.gap_seconds += now - self.playing_until
+            self.playing_until = now
+        self.playing_until += len(audio) / sample_rate
+
+    def wait(self):
+        if self.playing_until is not None:
+            time.sleep(max(self.playing_until - time.perf_counter(), 0))
+
+
+def request_completion():
+    requested_at = time.perf_counter()
+    completion = get_client().chat.completions.create(
+        model=config.MODEL_ID,
+        messages=[{"role": "user", "content": "How should I cache this?"}],
+        stream=True,
+    )
+    return completion, requested_at
+
+
+def whole_response() -> tuple[float, float]:
+    completion, requested_at = request_completion()
+    text = "".join(stream_text(completion, requested_at))
+    response = get_client().audio.speech.create(
+        model=config.TTS_MODEL, voice=config.TTS_VOICE, input=text, response_format="pcm"
+    )
+    audio = np.frombuffer(response.content, dtype="<i2")
+    first_audio = time.perf_counter() - requested_at
+    time.sleep(len(audio) / SPEECH_SAMPLE_RATE)  # Playback
+    return first_audio, 0.0
+
+
+def streamed_response() -> tuple[float, float]:
+    completion, requested_at = request_completion()
+    player = SimulatedPlayer()
+    speaker = StreamingSpeaker(requested_at, player=player, speed=1)
+    for str_delta in stream_text(completion, requested_at):
+        speaker.write(str_delta)
+    speaker.close("")
+    return speaker.time_to_first_audio, player.gap_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.03)
+    parser.add_argument("--speech-delay", type=float, default=0.3)
+    parser.add_argument("--speech-seconds-per-char", type=float, default=0.06)
+    args = parser.parse_args()
+
+    settings = StubSettings(
+        response=RESPONSE,
+        first_token_delay=args.first_token_delay,
+        token_delay=args.token_delay,
+        speech_delay=args.speech_delay,
+        speech_seconds_per_char=args.speech_seconds_per_char,
+    )
+    server = start_stub_server(settings)
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    config.OPENAI_BASE_URL = base_url(server)
+
+    print(f"{'path':<16} | {'first audio p50 s':>17} | {'p95 s':>6} | {'gaps s':>6}")
+    for name, run in (("whole response", whole_response), ("streamed", streamed_response)):
+        results = [run() for _ in range(args.runs)]
+        stats = percentiles([first_audio for first_audio, _ in results])
+        gaps = np.mean([gap for _, gap in results])
+        print(f"{name:<16} | {stats['p50']:>17.2f} | {stats['p95']:>6.2f} | {gaps:>6.2f}")
+    client_manager.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Decoded audio per second of the full window and incremental wake window transcription.
+
+Usage: python -m benchmarks.wake_window [--backend fake] [--seconds 60] [--hop 0.5]
+    [--context SECONDS] [--min-new 0.5]
+
+Streams a speech-like signal (or --wav) hop by hop through WakeWindowTranscriber, exactly as the
+wake pipeline does, and reports how many seconds of audio were sent to the speech to text model
+per second of stream, the model time per second of stream (above 1.0 it cannot keep up live) and
+how many utterances reached the action controller. The VAD is disabled so every hop counts.
+With the fake backend (default) the model cost is simulated with --real-time-factor. The
+context and minimum new audio default to WAKE_CONTEXT_SECONDS and WAKE_MIN_NEW_AUDIO_SECONDS;
+without a WAKE_CONTEXT_SECONDS the context is fitted to the fake backend's phrase.
+"""
+
+import argparse
+import sys
+import time
+
+from loguru import logger
+
+from benchmarks.corpus import SAMPLE_RATE, load_wav, synthesize_speech_like
+from voice_action_assistant.audio_buffer import AudioRingBuffer
+from voice_action_assistant.config import config
+from voice_action_assistant.recorder import AudioDetector
+from voice_action_assistant.stt_backends import FakeBackend, create_backend
+from voice_action_assistant.wake_window import WakeWindowTranscriber, phrase_seconds
+
+WINDOW_SECONDS = 3
+PHRASE = "okay hi computer"
+
+
+class StreamRecorder:
+    """The parts of AudioRecorder the wake window reads, fed directly instead of a microphone."""
+
+    def __init__(self):
+        self.fs = SAMPLE_RATE
+        self.max_seconds = WINDOW_SECONDS
+        self.signal_buffer = AudioRingBuffer(WINDOW_SECONDS * SAMPLE_RATE)
+
+
+class TimedTranscriber:
+    def __init__(self, backend):
+        self.backend = backend
+        self.model_seconds = 0.0
+
+    def transcribe_audio(self, audio, pre_audio_file: str = "") -> str:
+        start_time = time.perf_counter()
+        transcript = self.backend.transcribe(audio)
+        self.model_seconds += time.perf_counter() - start_time
+        return transcript.strip()
+
+
+def run(
+    audio,
+    backend,
+    incremental: bool,
+    hop_seconds: float,
+    context_seconds: float | None,
+    min_new_seconds: float,
+) -> dict:
+    recorder = StreamRecorder()
+    transcriber = TimedTranscriber(backend)
+    detector = AudioDetector(recorder, transcriber)
+    wake_window = WakeWindowTranscriber(
+        recorder,
+        detector,
+        incremental=incremental,
+        context_seconds=context_seconds,
+        min_new_seconds=min_new_seconds,
+    )
+    wake_window.fit_context([PHRASE])
+
+    hop = int(hop_seconds * SAMPLE_RATE)
+    utterances = 0
+    for start in range(0, len(audio) - hop + 1, hop):
+        recorder.signal_buffer.write(audio[start : start + hop])
+        if wake_window.transcribe(recorder.signal_buffer.total_written):
+            utterances += 1
+
+    stream_seconds = len(audio) / SAMPLE_RATE
+    return {
+        "decoded_per_second": detector.decoded_samples / SAMPLE_RATE / stream_seconds,
+        "model_time_per_second": transcriber.model_seconds / stream_seconds,
+        "utterances": utterances,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", default="fake")
+    parser.add_argument("--wav", help="Stream this 16 kHz recording instead of synthetic speech")
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--hop", type=float, default=0.5)
+    parser.add_argument("--context", type=float, default=config.WAKE_CONTEXT_SECONDS)
+    parser.add_argument("--min-new", type=float, default=config.WAKE_MIN_NEW_AUDIO_SECONDS)
+    parser.add_argument("--real-time-factor", type=float, default=0.05)
+    args = parser.parse_args()
+    # The wake window logs every stitched transcript at DEBUG level
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    audio = load_wav(args.wav) if args.wav else synthesize_speech_like(args.seconds)
+    if args.backend == "fake":
+        backend = FakeBackend(PHRASE, real_time_factor=args.real_time_factor)
+    else:
+        backend = create_backend(args.backend)
+
+    print(
+        f"{len(audio) / SAMPLE_RATE:.0f} s stream, {WINDOW_SECONDS} s window, {args.hop} s hop, "
+        f"{args.context or phrase_seconds(PHRASE)} s context, "
+        f"{args.min_new} s minimum new audio"
+    )
+    print(f"{'mode':<12} {'decoded s/s':>12} {'model s/s':>10} {'utterances':>11}")
+    for incremental in (False, True):
+        result = run(audio, backend, incremental, args.hop, args.context, args.min_new)
+        print(
+            f"{'incremental' if incremental else 'full window':<12} "
+            f"{result['decoded_per_second']:>12.2f} {result['model_time_per_second']:>10.3f} "
+            f"{result['utterances']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+import time
+
+# Reference point for the "import" phase of `va --profile-startup`
+IMPORT_STARTED_AT = time.perf_counter()
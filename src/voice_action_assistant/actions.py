@@ -1,24 +1,44 @@
 import json
 import os
-import re
+import shutil
+import time
+from functools import cached_property
 from textwrap import dedent
 from typing import Optional
 
+import numpy as np
 import pyperclip
 from loguru import logger
 
 from voice_action_assistant.config import config
+from voice_action_assistant.llm_cache import llm_cache
+from voice_action_assistant.llm_client import client_manager, get_client, stream_text
+from voice_action_assistant.matcher import PhraseRole
+from voice_action_assistant.output_sink import (
+    ClipboardTarget,
+    FileTarget,
+    LogTarget,
+    PrinterTarget,
+    StreamingOutputSink,
+)
 from voice_action_assistant.recorder import AudioRecorder
+from voice_action_assistant.settings_parser import (
+    RUNTIME_SETTINGS,
+    SettingsCommand,
+    SettingsCommandParser,
+)
+from voice_action_assistant.side_effects import side_effects
+from voice_action_assistant.streaming import StreamingTranscriber
+from voice_action_assistant.tracing import tracer
 from voice_action_assistant.transcriber import Transcriber
+from voice_action_assistant.tts import StreamingSpeaker
 from voice_action_assistant.utils import (
     ColorEnum,
     color_text,
     copy_to_clipboard,
-    init_client,
     load_config_yml,
     paste_at_cursor,
     play_sound,
-    python_printer,
     transcript_contains_phrase,
     tts_transcript,
 )
@@ -28,10 +48,15 @@ class Action:
     def __init__(self, phrase: str):
         self.phrase = phrase.lower()
         self.audio_files_dir = config.AUDIO_FILES_DIR
+        self.in_progress = False
 
-    def perform(self, transcript: str = None) -> "ActionResponse":
+    def perform(self, transcript: str = None, role: PhraseRole | None = None) -> "ActionResponse":
         raise NotImplementedError
 
+    def phrases(self) -> list[tuple[PhraseRole, str]]:
+        """Phrases that trigger this action, registered with the ActionController matcher."""
+        return [(PhraseRole.START, self.phrase)] if self.phrase else []
+
     @property
     def name(self):
         raise NotImplementedError
@@ -44,9 +69,25 @@ class ActionResponse:
 
 
 class TranscribeActionResponse(ActionResponse):
-    def __init__(self, action: Action, success: bool, transcript: Optional[str] = None):
+    def __init__(
+        self,
+        action: Action,
+        success: bool,
+        transcript: Optional[str] = None,
+        stopped_at: Optional[float] = None,
+        audio: Optional[np.ndarray] = None,
+    ):
         super().__init__(action, success)
         self.transcript = transcript
+        # The recording as returned by stop_recording, saved without copying the buffer again
+        self.audio = audio
+        # perf_counter() timestamp of the end of speech, used to report latency
+        self.stopped_at = stopped_at
+
+    def log_latency(self, stage: str):
+        if self.stopped_at is not None:
+            latency = time.perf_counter() - self.stopped_at
+            logger.info(f"End of speech to {stage} latency: {latency:0.2f} seconds")
 
 
 class StartTranscriptionAction(Action):
@@ -55,18 +96,22 @@ class StartTranscriptionAction(Action):
         phrase: str,
         audio_recorder: AudioRecorder,
         transcriber: Transcriber,
+        streaming_transcriber: StreamingTranscriber | None = None,
     ):
         super().__init__(phrase)
         self.phrase = phrase
         self.audio_recorder = audio_recorder
         self.transcriber = transcriber
-
-    def perform(self, action_phrase_transcript):
-        if (
-            transcript_contains_phrase(action_phrase_transcript, self.phrase)
-            and not self.audio_recorder.is_recording
-        ):
-            self.audio_recorder.start_recording()
+        self.streaming_transcriber = streaming_transcriber
+
+    def perform(self, action_phrase_transcript, matched: bool | None = None):
+        if matched is None:
+            matched = transcript_contains_phrase(action_phrase_transcript, self.phrase)
+        if matched and not self.audio_recorder.is_recording:
+            with tracer.span("start_recording"):
+                self.audio_recorder.start_recording()
+            if self.streaming_transcriber:
+                self.streaming_transcriber.start()
             logger.info("StartTranscriptionAction - Recording started.")
             play_sound(os.path.join(self.audio_files_dir, "sound_start.wav"))
             return ActionResponse(self, True)
@@ -79,25 +124,35 @@ class StopTranscriptionAction(Action):
         phrase: str,
         audio_recorder: AudioRecorder,
         transcriber: Transcriber,
+        streaming_transcriber: StreamingTranscriber | None = None,
     ):
         super().__init__(phrase)
         self.phrase = phrase
         self.audio_recorder = audio_recorder
         self.transcriber = transcriber
+        self.streaming_transcriber = streaming_transcriber
 
-    def perform(self, action_phrase_transcript, in_progress: bool = False):
+    def perform(
+        self, action_phrase_transcript, in_progress: bool = False, matched: bool | None = None
+    ):
         if not in_progress:
             return TranscribeActionResponse(self, False)
-        if (
-            transcript_contains_phrase(action_phrase_transcript, self.phrase)
-            and self.audio_recorder.is_recording
-        ):
-            audio_data = self.audio_recorder.stop_recording()
+        if matched is None:
+            matched = transcript_contains_phrase(action_phrase_transcript, self.phrase)
+        if matched and self.audio_recorder.is_recording:
+            stopped_at = time.perf_counter()
+            with tracer.span("stop_recording"):
+                audio_data = self.audio_recorder.stop_recording()
             logger.info("StopTranscriptionAction - Recording stopped.")
             play_sound(os.path.join(self.audio_files_dir, "sound_end.wav"))
-            action_phrase_transcript = self.transcriber.transcribe_audio(audio_data)
+            if self.streaming_transcriber:
+                action_phrase_transcript = self.streaming_transcriber.finish()
+            else:
+                action_phrase_transcript = self.transcriber.transcribe_dictation(audio_data)
             logger.info(f"Raw Transcript: {action_phrase_transcript}")
-            return TranscribeActionResponse(self, True, action_phrase_transcript)
+            return TranscribeActionResponse(
+                self, True, action_phrase_transcript, stopped_at, audio_data
+            )
         return TranscribeActionResponse(self, False)
 
 
@@ -113,37 +168,70 @@ class TranscribeAction(Action):
     ):
         # An empty phrase as this action is composed of sub-actions
         super().__init__("")
+        streaming_transcriber = (
+            StreamingTranscriber(audio_recorder, transcriber)
+            if config.STREAMING_TRANSCRIPTION
+            else None
+        )
         self.start_action = StartTranscriptionAction(
-            start_action_phrase, audio_recorder, transcriber
+            start_action_phrase, audio_recorder, transcriber, streaming_transcriber
+        )
+        self.stop_action = StopTranscriptionAction(
+            stop_action_phrase, audio_recorder, transcriber, streaming_transcriber
         )
-        self.stop_action = StopTranscriptionAction(stop_action_phrase, audio_recorder, transcriber)
         self.transcriber = transcriber
         self.audio_recorder = audio_recorder
-        self.in_progress = False
         self.action_name = action_name
         self.system_message = system_message
 
     def _action_logic(self, transcription_response) -> TranscribeActionResponse:
         raise NotImplementedError
 
-    def perform(self, action_phrase_transcript):
-        start_action_response = self.start_action.perform(action_phrase_transcript)
-        stop_action_response = self.stop_action.perform(action_phrase_transcript, self.in_progress)
+    def _on_recording_started(self):
+        """Hook for work that can overlap with the user speaking."""
+        pass
+
+    def phrases(self) -> list[tuple[PhraseRole, str]]:
+        return [
+            (PhraseRole.START, self.start_action.phrase),
+            (PhraseRole.STOP, self.stop_action.phrase),
+        ]
+
+    def perform(self, action_phrase_transcript, role: PhraseRole | None = None):
+        # With a role the controller has already matched the phrase, otherwise check both
+        start_matched = None if role is None else role == PhraseRole.START
+        stop_matched = None if role is None else role == PhraseRole.STOP
+        start_action_response = self.start_action.perform(action_phrase_transcript, start_matched)
+        stop_action_response = self.stop_action.perform(
+            action_phrase_transcript, self.in_progress, stop_matched
+        )
         if start_action_response.success:
             self.in_progress = True
+            self._on_recording_started()
             return TranscribeActionResponse(self.start_action, True)
         elif stop_action_response.success and self.in_progress:
             self.in_progress = False
-            return self._action_logic(stop_action_response)
+            with tracer.span("action_logic", action=self.name):
+                return self._action_logic(stop_action_response)
         logger.debug("TranscribeAction did not perform any action.")
         return TranscribeActionResponse(self, False)
 
-    def _clean_and_save_transcript(self, transcript):
+    def _clean_and_save_transcript(self, transcript, audio: np.ndarray):
         cleaned_transcript = self.transcriber.clean_transcript(transcript, self.stop_action.phrase)
-        self.transcriber.save_transcript(transcript)
-        self.audio_recorder.save_recording("output.mp3")
+        side_effects.submit(self.transcriber.save_transcript, transcript)
+        side_effects.submit(self._save_recording, audio, transcript)
         return cleaned_transcript
 
+    def _save_recording(self, audio, transcript):
+        file_name = f"output.{config.RECORDING_FORMAT}"
+        self.audio_recorder.save_recording(file_name, audio)
+        if config.RECORDINGS_ARCHIVE_DIR:
+            os.makedirs(config.RECORDINGS_ARCHIVE_DIR, exist_ok=True)
+            stem = os.path.join(config.RECORDINGS_ARCHIVE_DIR, time.strftime("%Y%m%d-%H%M%S"))
+            shutil.copyfile(file_name, f"{stem}.{config.RECORDING_FORMAT}")
+            with open(f"{stem}.txt", "w") as f:
+                f.write(transcript)
+
 
 class TranscribeAndSaveTextAction(TranscribeAction):
     def __init__(
@@ -168,9 +256,12 @@ class TranscribeAndSaveTextAction(TranscribeAction):
         logger.debug(f"Transcription response for Paste action: {transcription_response}")
         if transcription_response.success:
             transcript = transcription_response.transcript
-            cleaned_transcript = self._clean_and_save_transcript(transcript)
+            cleaned_transcript = self._clean_and_save_transcript(
+                transcript, transcription_response.audio
+            )
             copy_to_clipboard(cleaned_transcript)
             paste_at_cursor()
+            transcription_response.log_latency("clipboard")
             logger.info(f"Processed Transcript: {transcript}")
             play_sound(os.path.join(config.AUDIO_FILES_DIR, "action-complete-audio.wav"))
             return ActionResponse(success=True, action=self)
@@ -203,68 +294,82 @@ class TalkToLanguageModelAction(TranscribeAction):
         )
         self.system_message = system_message or default_system_message
 
+    def _on_recording_started(self):
+        # Re-open the pooled connection while the user talks if it expired while idle
+        if config.OPENAI_PRECONNECT:
+            client_manager.preconnect()
+
     def _action_logic(self, transcription_response: TranscribeActionResponse) -> ActionResponse:
         # Implement specific logic for post-processing after transcription
         if transcription_response.success:
             transcript = transcription_response.transcript
-            cleaned_transcript = self._clean_and_save_transcript(transcript)
+            cleaned_transcript = self._clean_and_save_transcript(
+                transcript, transcription_response.audio
+            )
+
+            transcription_response.log_latency("transcript")
 
             # LLM Logic
+            clipboard = pyperclip.paste()
             system_prompt = dedent(
                 f"""\
                 {self.system_message}
 
                 My current clipboard content (if any):
-                {pyperclip.paste()}
+                {clipboard}
                 """
             )
-
-            openai_client = init_client()
-            completion = openai_client.chat.completions.create(
-                model=config.MODEL_ID,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"{cleaned_transcript}"},
-                ],
-                max_tokens=2048,
-                temperature=0.1,
-                stream=True,
-            )
-
-            llm_response_content = ""
-
-            # open the file in append mode
+            request_params = {"max_tokens": 2048, "temperature": 0.1}
+
+            cache_key, cached_deltas = None, None
+            if config.LLM_CACHE_ENABLED:
+                cache_key = llm_cache.key(
+                    config.MODEL_ID,
+                    self.system_message,
+                    clipboard,
+                    cleaned_transcript,
+                    **request_params,
+                )
+                cached_deltas = llm_cache.get(cache_key)
+
+            requested_at = time.perf_counter()
+            if cached_deltas is None:
+                completion = get_client().chat.completions.create(
+                    model=config.MODEL_ID,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": f"{cleaned_transcript}"},
+                    ],
+                    stream=True,
+                    **request_params,
+                )
 
             print("\n----- LLM Response Started  -----\n")
-            with open("live_response.md", "w") as f:
-                f.write("# LLM RESPONSE\n\n")
-            for chunk in completion:
-                str_delta = chunk.choices[0].delta.content
-                if str_delta:
-                    with open("live_response.md", "a") as f:
-                        f.write(str_delta)
-                    llm_response_content += str_delta
-                    python_printer.print(str_delta)
-
-            print("\n----- LLM Response Finished -----\n")
-            with open("output.txt", "a") as f:
-                f.write(f"\nLLM output:\n{llm_response_content}")
-
-            # Copy relevant to clipboard
-            try:
-                copy_to_clipboard(llm_response_content)
-                if config.EXTRACT_CODE_BLOCKS:
-                    code_blocks = re.findall(r"```.*?\n(.*?)```", llm_response_content, re.DOTALL)
-                    print("Code Blocks: ", code_blocks)
-                    if code_blocks:
-                        formatted_code_blocks = "\n---\n".join(code_blocks)
-                        copy_to_clipboard(formatted_code_blocks)
-            except Exception as e:
-                logger.error(e)
-                none_python_text = llm_response_content
-
-            if config.USE_TTS:
-                tts_transcript(none_python_text)
+            targets = [
+                FileTarget("live_response.md", mode="w", header="# LLM RESPONSE\n\n"),
+                LogTarget("output.txt", header="\nLLM output:\n"),
+                PrinterTarget(),
+                ClipboardTarget(),
+            ]
+            if config.USE_TTS and config.TTS_STREAMING:
+                # Last, so the clipboard is ready while the end of the answer is spoken
+                targets.append(StreamingSpeaker(requested_at))
+            sink = StreamingOutputSink(targets)
+            with sink:
+                if cached_deltas is not None:
+                    with tracer.span("llm_cache_replay"):
+                        for str_delta in cached_deltas:
+                            sink.write(str_delta)
+                else:
+                    for str_delta in stream_text(completion, requested_at):
+                        sink.write(str_delta)
+                print("\n----- LLM Response Finished -----\n")
+            llm_response_content = sink.text
+            if cache_key is not None and cached_deltas is None:
+                llm_cache.put(cache_key, config.MODEL_ID, sink.parts)
+
+            if config.USE_TTS and not config.TTS_STREAMING:
+                tts_transcript(llm_response_content)
 
             play_sound(os.path.join(config.AUDIO_FILES_DIR, "action-complete-audio.wav"))
             return ActionResponse(success=True, action=self)
@@ -296,26 +401,63 @@ class AssistantSettingsAction(TranscribeAction):
         )
 
     def _action_logic(self, transcription_response: TranscribeActionResponse) -> ActionResponse:
-        openai_client = init_client()
-        cleaned_transcript = self._clean_and_save_transcript(transcription_response.transcript)
+        cleaned_transcript = self._clean_and_save_transcript(
+            transcription_response.transcript, transcription_response.audio
+        )
         try:
-            config_attributes = load_config_yml("settings_config.yml")
-            preprompt = f"""
-                Update config settings based on config attributes.
-                Return json object with updated settings or a specific indicator for viewing settings.
-                Assume values if not given e.g. "enable internet" -> "USE_INTERNET=True"
-                If the user wants to view settings, return 'VIEW_SETTINGS'.
-
-                Only use the Attributes: {config_attributes}
-
-                Example Response:
-                ```json
-                {{
-                    "ATTRIBUTE_NAME": "NEW_VALUE"
-                }}
-                ```
-            """
-            response = openai_client.chat.completions.create(
+            command = None
+            if config.SETTINGS_FAST_PATH_ENABLED:
+                with tracer.span("settings_fast_path"):
+                    command = self.settings_parser.parse(cleaned_transcript)
+                self.settings_parser.record(fast_path=command is not None)
+            if command is None:
+                command = self._ask_language_model(cleaned_transcript)
+            if command is None:
+                logger.warning(f"Could not interpret settings command: {cleaned_transcript}")
+                return ActionResponse(self, False)
+
+            if command.view:
+                current_settings = {
+                    attr: getattr(config, attr) for attr in self.configured_attributes
+                }
+                print("Current Settings:", json.dumps(current_settings, indent=4))
+            for key, value in command.updates.items():
+                config.update(key, value)
+                logger.info(f"Updated {key} to {getattr(config, key)!r}")
+                if key not in RUNTIME_SETTINGS:
+                    logger.warning(f"{key} is only read at startup, restart to apply it")
+            return ActionResponse(self, True)
+        except Exception as e:
+            logger.error(e)
+            return ActionResponse(self, False)
+
+    @cached_property
+    def configured_attributes(self) -> list[str]:
+        return list(load_config_yml("settings_config.yml"))
+
+    @cached_property
+    def settings_parser(self) -> SettingsCommandParser:
+        return SettingsCommandParser(self.configured_attributes)
+
+    def _ask_language_model(self, cleaned_transcript: str) -> SettingsCommand | None:
+        config_attributes = self.configured_attributes
+        preprompt = f"""
+            Update config settings based on config attributes.
+            Return json object with updated settings or a specific indicator for viewing settings.
+            Assume values if not given e.g. "enable internet" -> "USE_INTERNET=True"
+            If the user wants to view settings, return 'VIEW_SETTINGS'.
+
+            Only use the Attributes: {config_attributes}
+
+            Example Response:
+            ```json
+            {{
+                "ATTRIBUTE_NAME": "NEW_VALUE"
+            }}
+            ```
+        """
+        with tracer.span("llm_settings_request"):
+            response = get_client().chat.completions.create(
                 model=config.MODEL_ID,
                 messages=[
                     {"role": "system", "content": preprompt},
@@ -327,22 +469,14 @@ class AssistantSettingsAction(TranscribeAction):
                 max_tokens=1000,
                 temperature=0.1,
             )
-            response_text = response.choices[0].message.content
-            logger.info(f"Response: {response_text}")
-            if "VIEW_SETTINGS" in response_text:
-                # Print current settings
-                current_settings = {attr: getattr(config, attr) for attr in config_attributes}
-                print("Current Settings:", json.dumps(current_settings, indent=4))
-                return ActionResponse(self, True)
-            elif "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0]
-                response_json = json.loads(response_text)
-                for key, value in response_json.items():
-                    config.update(key, value)
-                return ActionResponse(self, True)
-        except Exception as e:
-            logger.error(e)
-            return ActionResponse(self, False)
+        response_text = response.choices[0].message.content or ""
+        logger.info(f"Response: {response_text}")
+        if "VIEW_SETTINGS" in response_text:
+            return SettingsCommand(view=True)
+        if "```json" in response_text:
+            response_text = response_text.split("```json")[1].split("```")[0]
+            return SettingsCommand(updates=json.loads(response_text))
+        return None
 
     @property
     def name(self):
@@ -0,0 +1,100 @@
+from threading import Lock
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Fixed-capacity float32 ring buffer for mono audio samples.
+
+    The backing array is allocated once with `np.empty`, so pages are only committed by the OS
+    as they are written. Writes are O(1) per sample and never allocate. Reads return a view when
+    the requested samples are contiguous in memory and a single copy when they wrap around.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"Capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self._buffer = np.empty(capacity, dtype=np.float32)
+        self._write_index = 0
+        self._total_written = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return min(self._total_written, self.capacity)
+
+    @property
+    def total_written(self) -> int:
+        """Number of samples written since the last reset (the stream position)."""
+        return self._total_written
+
+    def reset(self):
+        with self._lock:
+            self._write_index = 0
+            self._total_written = 0
+
+    def write(self, samples: np.ndarray):
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        n_samples = len(samples)
+        if n_samples == 0:
+            return
+
+        with self._lock:
+            if n_samples >= self.capacity:
+                # Only the newest `capacity` samples survive
+                self._buffer[:] = samples[-self.capacity :]
+                self._write_index = 0
+            else:
+                end = self._write_index + n_samples
+                if end <= self.capacity:
+                    self._buffer[self._write_index : end] = samples
+                else:
+                    split = self.capacity - self._write_index
+                    self._buffer[self._write_index :] = samples[:split]
+                    self._buffer[: n_samples - split] = samples[split:]
+                self._write_index = end % self.capacity
+            self._total_written += n_samples
+
+    def latest(self, n_samples: int, copy: bool = True) -> np.ndarray:
+        """
+        Return the newest `n_samples` samples in chronological order.
+
+        With `copy=False` a read-only view is returned when the samples are contiguous. The view
+        is only valid until the writer wraps around, so use it for immediate, short-lived reads.
+        Wrapped samples always cost exactly one copy.
+        """
+        with self._lock:
+            n_samples = max(0, min(n_samples, len(self)))
+            start = self._write_index - n_samples
+            if start < 0:
+                return np.concatenate((self._buffer[start:], self._buffer[: self._write_index]))
+            if copy:
+                return self._buffer[start : self._write_index].copy()
+            view = self._buffer[start : self._write_index]
+            view.flags.writeable = False
+            return view
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """
+        Return a copy of the samples between two stream positions (see `total_written`).
+
+        Positions that have already been overwritten are clipped to the oldest buffered sample.
+        """
+        with self._lock:
+            oldest = self._total_written - len(self)
+            start = max(start, oldest)
+            stop = min(stop, self._total_written)
+            if stop <= start:
+                return np.empty(0, dtype=np.float32)
+            first = (self._write_index - (self._total_written - start)) % self.capacity
+            n_samples = stop - start
+            if first + n_samples <= self.capacity:
+                return self._buffer[first : first + n_samples].copy()
+            return np.concatenate(
+                (self._buffer[first:], self._buffer[: first + n_samples - self.capacity])
+            )
+
+    def snapshot(self, copy: bool = True) -> np.ndarray:
+        """Return every buffered sample in chronological order."""
+        return self.latest(len(self), copy=copy)
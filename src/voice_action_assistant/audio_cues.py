@@ -0,0 +1,189 @@
+import os
+import time
+from threading import Lock
+from typing import Callable
+
+import numpy as np
+from loguru import logger
+from pygame import mixer, sndarray
+
+from voice_action_assistant.config import config
+
+CUE_SAMPLE_RATE = 44100
+CUE_CHANNEL = 0
+SPEECH_CHANNEL = 1  # Streamed text to speech, see tts.py
+
+
+def generate_ping_sound(start_frequency, end_frequency, duration, sample_rate=CUE_SAMPLE_RATE):
+    # Generate time array
+    t = np.linspace(0, duration, int(duration * sample_rate), False)
+
+    # Create a frequency array that slides over time
+    frequency = np.linspace(start_frequency, end_frequency, int(duration * sample_rate))
+
+    # Generate a sliding sine wave
+    note = np.sin(2 * np.pi * frequency * t)
+
+    # Reduce loudness
+    amplitude = 0.125
+    audio = note * amplitude * (2**15 - 1) / np.max(np.abs(note))
+    return audio.astype(np.int16)
+
+
+def my_fn(n):
+    if n > 300:
+        return (510 - n) ** (3 / 2)
+    return n ** (3 / 2)
+
+
+def generate_bell_sound(frequencies, decay_rates, duration, sample_rate=CUE_SAMPLE_RATE):
+    # Generate time array
+    t = np.linspace(0, duration, int(duration * sample_rate), False)
+
+    # Generate bell sound
+    bell_audio = np.zeros_like(t)
+    for freq, decay in zip(frequencies, decay_rates):
+        bell_audio += np.exp(-decay * t) * np.sin(2 * np.pi * freq * t)
+
+    # Normalize bell sound
+    bell_audio = bell_audio / np.max(np.abs(bell_audio))
+    audio = bell_audio * 2 * np.hanning(len(bell_audio) * 2)[len(bell_audio) : len(bell_audio) * 2]
+
+    return audio
+
+
+def bell_correct_audio(frequencies, decay_rates, duration, amplitude=0.15):
+    audio = generate_bell_sound(frequencies, decay_rates, duration)
+
+    # Reduce loudness
+    audio = audio * amplitude * (2**15 - 1) / np.max(np.abs(audio))
+    return audio.astype(np.int16)
+
+
+def generate_sound_from_function(func, length, duration, sample_rate=CUE_SAMPLE_RATE):
+    # Generate sequence from function
+    sequence = np.array([func(i) for i in range(length)], dtype=float)
+
+    # Normalize sequence
+    sequence = sequence / np.max(np.abs(sequence))
+
+    # Repeat sequence to fill duration
+    sequence = np.tile(sequence, int(np.ceil(duration * sample_rate / length)))
+
+    # Generate time array
+    t = np.linspace(0, duration, int(duration * sample_rate), False)
+    sequence = sequence[: len(t)]
+
+    # Generate audio data
+    audio = np.sin(5 * np.pi * sequence * t)
+    audio = audio * np.hanning(len(audio) * 2)[len(audio) : len(audio) * 2]
+
+    ding_freqs = [55, 110, 165, 220]  # Frequencies for the "gong" sound
+    ding_decays = [0.5, 0.75, 1, 1.25]  # Decay rates for the "gong" sound
+    ding_duration = 2.0
+    ding_audio = generate_bell_sound(ding_freqs, ding_decays, ding_duration)
+
+    # Append "bing" sound to audio data
+    audio = np.concatenate((audio, ding_audio))
+
+    # Reduce loudness
+    amplitude = 0.5
+    audio = audio * amplitude * (2**15 - 1) / np.max(np.abs(audio))
+    return audio.astype(np.int16)
+
+
+def shutdown_sound():
+    bell_audio = bell_correct_audio([55, 110, 165, 220], [5, 7, 9, 11], 2.0)
+    return bell_audio[len(bell_audio) // 2 :: -1]
+
+
+# Every cue the assistant plays, as mono int16 at CUE_SAMPLE_RATE
+CUE_GENERATORS: dict[str, Callable[[], np.ndarray]] = {
+    "sound_start.wav": lambda: generate_ping_sound(140, 700, 0.15),
+    "sound_end.wav": lambda: generate_ping_sound(1000, 440, 0.15),
+    "program_start.wav": lambda: generate_ping_sound(400, 500, 0.1),
+    "startup-audio.wav": lambda: generate_sound_from_function(my_fn, 510, 2),
+    "shutdown-audio.wav": shutdown_sound,
+    "action-complete-audio.wav": lambda: bell_correct_audio(
+        [830, 1661, 2489, 3322], [0.5, 0.75, 1, 1.25], 1.0, 0.05
+    ),
+}
+
+
+def init_mixer():
+    """Initialise the pygame mixer once for the whole process."""
+    if not mixer.get_init():
+        mixer.init()
+
+
+def make_sound(audio: np.ndarray, sample_rate: int = CUE_SAMPLE_RATE) -> mixer.Sound:
+    """Turn mono int16 audio into a Sound, resampled to the mixer's rate and channel count."""
+    frequency, _, channels = mixer.get_init()
+    if frequency != sample_rate:
+        positions = np.arange(int(len(audio) * frequency / sample_rate))
+        audio = np.interp(positions * sample_rate / frequency, np.arange(len(audio)), audio)
+        audio = audio.astype(np.int16)
+    if channels > 1:
+        audio = np.repeat(audio[:, np.newaxis], channels, axis=1)
+    return sndarray.make_sound(np.ascontiguousarray(audio))
+
+
+class AudioCues:
+    """
+    Plays the short start, stop and completion cues without blocking the caller.
+
+    The mixer is initialised once and every cue is decoded into memory up front, from the WAV
+    files in `audio_files_dir` or synthesised with `CUE_GENERATORS` when a file is missing. Cues
+    play on a reserved mixer channel, so they never interrupt text to speech on the speech
+    channel and a new cue simply replaces one that is still playing.
+    """
+
+    def __init__(self, audio_files_dir: str = config.AUDIO_FILES_DIR):
+        self.audio_files_dir = audio_files_dir
+        self.sounds: dict[str, mixer.Sound] = {}
+        self.channel: mixer.Channel | None = None
+        self._lock = Lock()
+
+    def load(self):
+        with self._lock:
+            if self.channel is not None:
+                return
+            init_mixer()
+            mixer.set_reserved(2)  # CUE_CHANNEL and SPEECH_CHANNEL
+            self.channel = mixer.Channel(CUE_CHANNEL)
+
+            start_time = time.perf_counter()
+            for name in CUE_GENERATORS:
+                self.sounds[name] = self._load_cue(name)
+            if os.path.isdir(self.audio_files_dir):
+                for name in os.listdir(self.audio_files_dir):
+                    if name.endswith(".wav") and name not in self.sounds:
+                        self.sounds[name] = self._load_cue(name)
+            logger.debug(
+                f"Loaded {len(self.sounds)} audio cues "
+                f"in {time.perf_counter() - start_time:0.3f} seconds"
+            )
+
+    def _load_cue(self, name: str) -> mixer.Sound:
+        path = os.path.join(self.audio_files_dir, name)
+        if os.path.exists(path):
+            return mixer.Sound(path)
+        logger.debug(f"{path} not found, synthesizing the cue")
+        return make_sound(CUE_GENERATORS[name]())
+
+    def play(self, sound_file: str, wait: bool = False):
+        """Play a cue by file name or path, returning immediately unless `wait` is set."""
+        self.load()
+        name = os.path.basename(sound_file)
+        sound = self.sounds.get(name)
+        if sound is None:
+            # Not one of the preloaded cues; decode it once and keep it
+            sound = self.sounds[name] = mixer.Sound(sound_file)
+        self.channel.play(sound)
+        if wait:
+            time.sleep(sound.get_length())
+            while self.channel.get_busy():
+                time.sleep(0.01)
+
+
+audio_cues = AudioCues()
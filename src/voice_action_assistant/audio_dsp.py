@@ -0,0 +1,60 @@
+import numpy as np
+
+
+def time_stretch(
+    audio: np.ndarray,
+    sample_rate: int,
+    speed: float,
+    frame_seconds: float = 0.04,
+    tolerance_seconds: float = 0.01,
+) -> np.ndarray:
+    """
+    Play mono `audio` `speed` times faster without changing its pitch (WSOLA).
+
+    The output is built from Hann windowed frames laid down every half frame. Each frame is read
+    from around where the speed says it should come from in the input. Within
+    `tolerance_seconds` of that, the start that best continues the previous frame (highest
+    cross-correlation) is used, so overlapping frames stay in phase and voices do not warble.
+    Returns audio of the input's dtype, about `len(audio) / speed` samples long.
+    """
+    if speed == 1 or len(audio) == 0:
+        return audio
+    if speed <= 0:
+        raise ValueError(f"speed must be positive, got {speed}")
+
+    frame = int(frame_seconds * sample_rate)
+    synthesis_hop = frame // 2
+    analysis_hop = synthesis_hop * speed
+    tolerance = int(tolerance_seconds * sample_rate)
+    window = np.hanning(frame + 1)[:-1].astype(np.float32)  # Periodic, sums to 1 at 50% overlap
+
+    # Padded so every search region and natural continuation stays inside the signal
+    signal = np.pad(audio.astype(np.float32), (tolerance, frame + tolerance))
+    n_output = int(len(audio) / speed)
+    n_frames = n_output // synthesis_hop + 1
+    output = np.zeros(n_frames * synthesis_hop + frame, dtype=np.float32)
+    weights = np.zeros_like(output)
+
+    previous = 0
+    for index in range(n_frames):
+        ideal = int(index * analysis_hop)
+        if index == 0:
+            start = ideal
+        else:
+            # What would have followed the previous frame if the speed were 1
+            natural = signal[previous + tolerance + synthesis_hop :][:frame]
+            region = signal[ideal : ideal + frame + 2 * tolerance]
+            if len(region) < frame + 2 * tolerance or len(natural) < frame:
+                break
+            start = ideal - tolerance + int(np.argmax(np.correlate(region, natural, "valid")))
+        out = index * synthesis_hop
+        output[out : out + frame] += signal[start + tolerance :][:frame] * window
+        weights[out : out + frame] += window
+        previous = start
+
+    # Only the first and last half frame are not covered twice
+    output = output[:n_output] / np.maximum(weights[:n_output], 1e-3)
+    if np.issubdtype(audio.dtype, np.integer):
+        limits = np.iinfo(audio.dtype)
+        return np.clip(np.round(output), limits.min, limits.max).astype(audio.dtype)
+    return output.astype(audio.dtype)
@@ -1,5 +1,6 @@
-from typing import Tuple, Type
+from typing import Literal, Tuple, Type
 
+from pydantic import TypeAdapter, model_validator
 from pydantic_settings import (
     BaseSettings,
     PydanticBaseSettingsSource,
@@ -15,10 +16,75 @@ class Settings(BaseSettings):
     LOCAL: bool = True
     MAX_AUDIO_LENGTH_SECONDS: int = 3600
     USE_TTS: bool = False
+    TTS_STREAMING: bool = True
+    TTS_MODEL: str = "tts-1"
+    TTS_VOICE: str = "alloy"
+    TTS_MIN_SENTENCE_CHARS: int = 20
+    TTS_MAX_CONCURRENT_REQUESTS: int = 3
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_DIR: str = ".llm_cache"
+    LLM_CACHE_MEMORY_ENTRIES: int = 64
+    LLM_CACHE_MAX_DISK_MB: int = 50
+    LLM_CACHE_TTL_SECONDS: float = 7 * 24 * 60 * 60
     AUDIO_SPEED: float = 1.25
     AUDIO_FILES_DIR: str = "src/audio_files"
     LLM_ACTION_PROMPTS_DIR: str = "src/llm-action-prompts"
     PASTE_AT_CURSOR: bool = False
+    STT_BACKEND: str = "transformers"
+    STT_MODEL_ID: str = "distil-whisper/distil-small.en"
+    STT_MODEL_CACHE_DIR: str = ".model_cache"
+    STT_WARMUP: bool = True
+    STT_ACCELERATION: list[Literal["int8", "compile", "sdpa"]] = []
+    TORCH_NUM_THREADS: int | None = None
+    TORCH_NUM_INTEROP_THREADS: int | None = None
+    STT_DICTATION_BACKEND: str | None = None
+    STT_ASSISTED_MAIN_MODEL_ID: str = "openai/whisper-large-v3"
+    STT_ASSISTED_DRAFT_MODEL_ID: str = "distil-whisper/distil-large-v3"
+    STT_CTRANSLATE2_MODEL: str = "distil-small.en"
+    STT_CTRANSLATE2_COMPUTE_TYPE: str = "int8"
+    STT_FAKE_TRANSCRIPT: str = ""
+    STT_FAKE_REAL_TIME_FACTOR: float = 0.0
+    OPENAI_BASE_URL: str | None = None
+    OPENAI_TIMEOUT_SECONDS: float = 60.0
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    OPENAI_MAX_RETRIES: int = 2
+    OPENAI_MAX_CONNECTIONS: int = 10
+    OPENAI_KEEPALIVE_SECONDS: float = 120.0
+    OPENAI_PRECONNECT: bool = True
+    RECORDING_FORMAT: Literal["mp3", "opus", "wav"] = "mp3"
+    RECORDINGS_ARCHIVE_DIR: str | None = None
+    SIDE_EFFECT_QUEUE_SIZE: int = 16
+    SIDE_EFFECT_DRAIN_TIMEOUT_SECONDS: float = 60.0
+    STREAM_FLUSH_INTERVAL_SECONDS: float = 0.25
+    WAKE_HOP_SECONDS: float = 0.5
+    WAKE_INCREMENTAL_DECODING: bool = True
+    WAKE_CONTEXT_SECONDS: float | None = None
+    WAKE_MIN_NEW_AUDIO_SECONDS: float = 0.5
+    PIPELINE_ASR_QUEUE_SIZE: int = 1
+    PIPELINE_DISPATCH_QUEUE_SIZE: int = 8
+    PIPELINE_METRICS_LOG_SECONDS: float = 60.0
+    METRICS_ENABLED: bool = False
+    METRICS_SNAPSHOT_FILE: str | None = "metrics.json"
+    METRICS_SNAPSHOT_SECONDS: float = 60.0
+    METRICS_HTTP_PORT: int | None = None
+    TRACING_ENABLED: bool = False
+    TRACE_FILE: str = "traces.json"
+    TRACE_MAX_INTERACTIONS: int = 200
+    SETTINGS_FAST_PATH_ENABLED: bool = True
+    VAD_ENABLED: bool = True
+    VAD_BACKEND: str = "energy"
+    VAD_ENERGY_THRESHOLD: float = 0.01
+    VAD_ZCR_THRESHOLD: float = 0.35
+    VAD_MIN_SPEECH_RATIO: float = 0.05
+    VAD_SILERO_THRESHOLD: float = 0.5
+    VAD_HANGOVER_WINDOWS: int = 2
+    KWS_ENABLED: bool = False
+    KWS_TEMPLATES_FILE: str = "keyword_templates.npz"
+    KWS_THRESHOLD: float = 0.35
+    STREAMING_TRANSCRIPTION: bool = False
+    STREAMING_MIN_SEGMENT_SECONDS: float = 10.0
+    STREAMING_MAX_SEGMENT_SECONDS: float = 28.0
+    STREAMING_SILENCE_SECONDS: float = 0.5
 
     model_config = SettingsConfigDict(yaml_file="settings_config.yml")
 
@@ -33,11 +99,20 @@ class Settings(BaseSettings):
     ) -> Tuple[PydanticBaseSettingsSource, ...]:
         return (YamlConfigSettingsSource(settings_cls),)
 
+    @model_validator(mode="after")
+    def check_streaming_segments(self) -> "Settings":
+        if self.STREAMING_MIN_SEGMENT_SECONDS >= self.STREAMING_MAX_SEGMENT_SECONDS:
+            raise ValueError(
+                "STREAMING_MIN_SEGMENT_SECONDS must be less than STREAMING_MAX_SEGMENT_SECONDS"
+            )
+        return self
+
     def update(self, attr_name: str, new_value):
-        if hasattr(self, attr_name):
-            setattr(self, attr_name, new_value)
-        else:
+        """Set a field, coercing the value to its type (e.g. "1.5" -> 1.5, "false" -> False)."""
+        field_info = type(self).model_fields.get(attr_name)
+        if field_info is None:
             raise ValueError(f"No such attribute: {attr_name}")
+        setattr(self, attr_name, TypeAdapter(field_info.annotation).validate_python(new_value))
 
 
 config = Settings()
@@ -0,0 +1,319 @@
+"""
+Cheap first-stage keyword spotting for the wake and stop phrases in actions_config.yml.
+
+Each phrase is enrolled from a few recordings, stored as MFCC templates and matched against the
+wake window with subsequence dynamic time warping (DTW). The spotter runs on every hop and only
+lets a window through to Whisper when some phrase is close enough to one of its templates.
+
+Enroll and evaluate from the command line:
+
+    va-keywords enroll --repeats 3
+    va-keywords evaluate --positives recordings/ --negatives background/
+"""
+
+import argparse
+import os
+import time
+from math import gcd
+
+import numpy as np
+import yaml
+from loguru import logger
+
+from voice_action_assistant.config import config
+
+SAMPLE_RATE = 16000
+
+
+def _mel_filterbank(n_filters: int, n_fft: int, fs: int) -> np.ndarray:
+    def hz_to_mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    def mel_to_hz(mel):
+        return 700 * (10 ** (mel / 2595) - 1)
+
+    mel_points = np.linspace(hz_to_mel(0), hz_to_mel(fs / 2), n_filters + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / fs).astype(int)
+
+    filterbank = np.zeros((n_filters, n_fft // 2 + 1), dtype=np.float32)
+    for i in range(1, n_filters + 1):
+        left, center, right = bins[i - 1], bins[i], bins[i + 1]
+        if center > left:
+            filterbank[i - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filterbank[i - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filterbank
+
+
+_FILTERBANKS: dict[tuple[int, int, int], np.ndarray] = {}
+
+
+def mfcc(
+    audio: np.ndarray,
+    fs: int = SAMPLE_RATE,
+    n_mfcc: int = 13,
+    n_filters: int = 26,
+    frame_seconds: float = 0.025,
+    hop_seconds: float = 0.01,
+) -> np.ndarray:
+    """Return cepstral-mean-normalised MFCCs of shape (n_frames, n_mfcc - 1), without c0."""
+    from scipy.fft import dct
+
+    frame_length = int(frame_seconds * fs)
+    hop_length = int(hop_seconds * fs)
+    if len(audio) < frame_length:
+        return np.empty((0, n_mfcc - 1), dtype=np.float32)
+
+    emphasized = np.append(audio[0], audio[1:] - 0.97 * audio[:-1]).astype(np.float32)
+    n_frames = 1 + (len(emphasized) - frame_length) // hop_length
+    frames = np.lib.stride_tricks.sliding_window_view(emphasized, frame_length)[::hop_length]
+    frames = frames[:n_frames] * np.hamming(frame_length).astype(np.float32)
+
+    n_fft = 1 << (frame_length - 1).bit_length()
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2 / n_fft
+
+    key = (n_filters, n_fft, fs)
+    if key not in _FILTERBANKS:
+        _FILTERBANKS[key] = _mel_filterbank(n_filters, n_fft, fs)
+    energies = np.log(power @ _FILTERBANKS[key].T + 1e-10)
+
+    cepstra = dct(energies, type=2, axis=1, norm="ortho")[:, 1:n_mfcc]
+    return (cepstra - cepstra.mean(axis=0)).astype(np.float32)
+
+
+def subsequence_dtw_distance(template: np.ndarray, features: np.ndarray) -> float:
+    """
+    Best length-normalised DTW cost of `template` against any span of `features`.
+
+    Frames are compared with cosine distance. Each template frame advances the match by zero,
+    one or two feature frames, so the spoken phrase may be up to twice as fast or slow as the
+    enrolled one.
+    """
+    if len(template) == 0 or len(features) == 0:
+        return float("inf")
+
+    def normalize(x):
+        return x / (np.linalg.norm(x, axis=1, keepdims=True) + 1e-8)
+
+    cost = 1.0 - normalize(template) @ normalize(features).T
+
+    accumulated = cost[0].copy()  # Free start anywhere in the stream
+    for i in range(1, len(template)):
+        previous = accumulated
+        best = previous.copy()
+        best[1:] = np.minimum(best[1:], previous[:-1])
+        best[2:] = np.minimum(best[2:], previous[:-2])
+        accumulated = cost[i] + best
+    return float(accumulated.min() / len(template))
+
+
+def trim_silence(audio: np.ndarray, fs: int = SAMPLE_RATE, relative_threshold: float = 0.1):
+    """Trim leading and trailing frames quieter than a fraction of the loudest frame."""
+    frame_length = int(0.01 * fs)
+    n_frames = len(audio) // frame_length
+    if n_frames == 0:
+        return audio
+    frames = audio[: n_frames * frame_length].reshape(n_frames, frame_length)
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    voiced = np.flatnonzero(rms >= relative_threshold * rms.max())
+    return audio[voiced[0] * frame_length : (voiced[-1] + 1) * frame_length]
+
+
+def phrase_slug(phrase: str) -> str:
+    return "_".join(phrase.lower().split())
+
+
+def phrases_from_actions_config(yaml_file: str) -> list[str]:
+    with open(yaml_file, "r") as file:
+        actions_config = yaml.safe_load(file)
+    phrases = []
+    for action_config in actions_config["actions"]:
+        for key in ("start_phrase", "end_phrase"):
+            phrase = action_config[key].lower()
+            if phrase not in phrases:
+                phrases.append(phrase)
+    return phrases
+
+
+class KeywordSpotter:
+    def __init__(self, threshold: float = 0.35, fs: int = SAMPLE_RATE):
+        self.threshold = threshold
+        self.fs = fs
+        self.templates: dict[str, list[np.ndarray]] = {}
+
+    def enroll(self, phrase: str, audio: np.ndarray):
+        template = mfcc(trim_silence(audio, self.fs), self.fs)
+        self.templates.setdefault(phrase.lower(), []).append(template)
+
+    def missing_phrases(self, phrases: list[str]) -> list[str]:
+        return [phrase for phrase in phrases if not self.templates.get(phrase.lower())]
+
+    def score(self, audio: np.ndarray) -> dict[str, float]:
+        """Return the best DTW distance per phrase (lower is a closer match)."""
+        features = mfcc(audio, self.fs)
+        return {
+            phrase: min(subsequence_dtw_distance(template, features) for template in templates)
+            for phrase, templates in self.templates.items()
+        }
+
+    def detect(self, audio: np.ndarray) -> list[str]:
+        """Return the candidate phrases whose distance is within the threshold."""
+        return [
+            phrase for phrase, distance in self.score(audio).items() if distance <= self.threshold
+        ]
+
+    def save(self, file_name: str):
+        arrays = {
+            f"{phrase}::{index}": template
+            for phrase, templates in self.templates.items()
+            for index, template in enumerate(templates)
+        }
+        np.savez(file_name, **arrays)
+
+    @classmethod
+    def load(cls, file_name: str, threshold: float = 0.35) -> "KeywordSpotter":
+        spotter = cls(threshold=threshold)
+        with np.load(file_name) as data:
+            for key in sorted(data.files):
+                phrase, _ = key.rsplit("::", 1)
+                spotter.templates.setdefault(phrase, []).append(data[key])
+        return spotter
+
+
+def create_keyword_spotter(actions_config_file: str) -> KeywordSpotter | None:
+    if not config.KWS_ENABLED:
+        return None
+    if not os.path.exists(config.KWS_TEMPLATES_FILE):
+        logger.warning(f"Keyword spotting disabled, no templates at {config.KWS_TEMPLATES_FILE}")
+        return None
+
+    spotter = KeywordSpotter.load(config.KWS_TEMPLATES_FILE, threshold=config.KWS_THRESHOLD)
+    missing = spotter.missing_phrases(phrases_from_actions_config(actions_config_file))
+    if missing:
+        # A phrase without templates could never be escalated, so do not gate at all
+        logger.warning(f"Keyword spotting disabled, no templates for phrases: {missing}")
+        return None
+    logger.info(f"Keyword spotter loaded with phrases: {list(spotter.templates)}")
+    return spotter
+
+
+def load_wav(file_name: str, fs: int = SAMPLE_RATE) -> np.ndarray:
+    from scipy.io import wavfile
+
+    rate, data = wavfile.read(file_name)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if np.issubdtype(data.dtype, np.integer):
+        data = data / np.iinfo(data.dtype).max
+    if rate != fs:
+        divisor = gcd(rate, fs)
+        from scipy.signal import resample_poly
+
+        data = resample_poly(data, fs // divisor, rate // divisor)
+    return data.astype(np.float32)
+
+
+def enroll(args):
+    import sounddevice as sd
+    from scipy.io import wavfile
+
+    phrases = args.phrases or phrases_from_actions_config(args.actions_config)
+    spotter = KeywordSpotter(threshold=config.KWS_THRESHOLD)
+    if args.append and os.path.exists(args.output):
+        spotter = KeywordSpotter.load(args.output, threshold=config.KWS_THRESHOLD)
+
+    for phrase in phrases:
+        phrase_dir = os.path.join(args.recordings_dir, phrase_slug(phrase))
+        os.makedirs(phrase_dir, exist_ok=True)
+        for repeat in range(args.repeats):
+            input(f"Press Enter, then say '{phrase}' ({repeat + 1}/{args.repeats})...")
+            audio = sd.rec(int(args.seconds * SAMPLE_RATE), samplerate=SAMPLE_RATE, channels=1)
+            sd.wait()
+            audio = audio[:, 0].astype(np.float32)
+            spotter.enroll(phrase, audio)
+            wav_path = os.path.join(phrase_dir, f"{int(time.time() * 1000)}.wav")
+            wavfile.write(wav_path, SAMPLE_RATE, audio)
+
+    spotter.save(args.output)
+    logger.info(f"Saved templates for {len(spotter.templates)} phrases to {args.output}")
+
+
+def sliding_windows(audio: np.ndarray, window_seconds: float, hop_seconds: float):
+    window, hop = int(window_seconds * SAMPLE_RATE), int(hop_seconds * SAMPLE_RATE)
+    if len(audio) <= window:
+        yield audio
+        return
+    for start in range(0, len(audio) - window + 1, hop):
+        yield audio[start : start + window]
+
+
+def evaluate(args):
+    spotter = KeywordSpotter.load(args.templates)
+
+    # Positives: <dir>/<phrase_slug>/*.wav, one utterance of the phrase per file
+    positive_distances = []
+    for phrase in spotter.templates:
+        phrase_dir = os.path.join(args.positives, phrase_slug(phrase))
+        if not os.path.isdir(phrase_dir):
+            continue
+        for file_name in sorted(os.listdir(phrase_dir)):
+            if file_name.endswith(".wav"):
+                audio = load_wav(os.path.join(phrase_dir, file_name))
+                positive_distances.append(spotter.score(audio)[phrase])
+
+    # Negatives: <dir>/*.wav without any phrase, scanned like the live wake window
+    negative_distances = []
+    negative_seconds = 0.0
+    for file_name in sorted(os.listdir(args.negatives)) if args.negatives else []:
+        if file_name.endswith(".wav"):
+            audio = load_wav(os.path.join(args.negatives, file_name))
+            negative_seconds += len(audio) / SAMPLE_RATE
+            for window in sliding_windows(audio, args.window_seconds, args.hop_seconds):
+                negative_distances.append(min(spotter.score(window).values()))
+
+    positives = np.array(positive_distances)
+    negatives = np.array(negative_distances)
+    print(f"{len(positives)} positive clips, {len(negatives)} negative windows")
+    print(f"{'threshold':>9} | {'false reject':>12} | {'false accept':>12} | false accepts/hour")
+    for threshold in np.arange(args.min_threshold, args.max_threshold + 1e-9, args.step):
+        frr = np.mean(positives > threshold) if len(positives) else float("nan")
+        far = np.mean(negatives <= threshold) if len(negatives) else float("nan")
+        per_hour = (
+            np.sum(negatives <= threshold) / (negative_seconds / 3600)
+            if negative_seconds
+            else float("nan")
+        )
+        print(f"{threshold:>9.2f} | {frr:>12.2%} | {far:>12.2%} | {per_hour:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enroll and evaluate wake/stop phrase templates")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enroll_parser = subparsers.add_parser("enroll", help="Record templates for each phrase")
+    enroll_parser.add_argument("phrases", nargs="*", help="Defaults to every configured phrase")
+    enroll_parser.add_argument("--actions-config", default="actions_config.yml")
+    enroll_parser.add_argument("--output", default=config.KWS_TEMPLATES_FILE)
+    enroll_parser.add_argument("--recordings-dir", default="keyword_recordings")
+    enroll_parser.add_argument("--repeats", type=int, default=3)
+    enroll_parser.add_argument("--seconds", type=float, default=2.0)
+    enroll_parser.add_argument("--append", action="store_true", help="Keep existing templates")
+    enroll_parser.set_defaults(func=enroll)
+
+    evaluate_parser = subparsers.add_parser("evaluate", help="Report false accept/reject rates")
+    evaluate_parser.add_argument("--templates", default=config.KWS_TEMPLATES_FILE)
+    evaluate_parser.add_argument("--positives", required=True)
+    evaluate_parser.add_argument("--negatives")
+    evaluate_parser.add_argument("--window-seconds", type=float, default=3.0)
+    evaluate_parser.add_argument("--hop-seconds", type=float, default=0.5)
+    evaluate_parser.add_argument("--min-threshold", type=float, default=0.1)
+    evaluate_parser.add_argument("--max-threshold", type=float, default=0.6)
+    evaluate_parser.add_argument("--step", type=float, default=0.05)
+    evaluate_parser.set_defaults(func=evaluate)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from loguru import logger
+
+from voice_action_assistant.config import config
+from voice_action_assistant.metrics import metrics
+from voice_action_assistant.side_effects import side_effects
+
+
+def digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of streamed LLM responses, an in-memory LRU in front of a directory.
+
+    The key is a digest of everything that decides the answer (model, system message, clipboard
+    and transcript, plus request parameters), so a retried or re-pasted request finds the
+    previous answer. The streamed deltas are stored rather than the joined text, so replaying
+    them prints exactly like the original stream. Entries expire after `ttl_seconds`, and the
+    least recently used files are removed once the directory grows past `max_disk_bytes`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = config.LLM_CACHE_DIR,
+        max_memory_entries: int = config.LLM_CACHE_MEMORY_ENTRIES,
+        max_disk_bytes: int = config.LLM_CACHE_MAX_DISK_MB * 1024 * 1024,
+        ttl_seconds: float = config.LLM_CACHE_TTL_SECONDS,
+    ):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self.memory: OrderedDict[str, dict] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    @staticmethod
+    def key(model: str, system_message: str, clipboard: str, transcript: str, **params) -> str:
+        return digest(
+            json.dumps(
+                [model, system_message, digest(clipboard), transcript, params], sort_keys=True
+            )
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _expired(self, entry: dict) -> bool:
+        return time.time() - entry["created_at"] > self.ttl_seconds
+
+    def get(self, key: str) -> list[str] | None:
+        """Return the cached deltas for `key`, or None on a miss."""
+        with self._lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.memory.move_to_end(key)
+            else:
+                entry = self._read(key)
+                if entry is not None:
+                    self._remember(key, entry)
+
+            if entry is not None and self._expired(entry):
+                self.memory.pop(key, None)
+                self._remove(self._path(key))
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                metrics.inc("llm_cache_misses_total")
+                return None
+            self.hits += 1
+            metrics.inc("llm_cache_hits_total")
+            logger.info(f"LLM response cache hit ({self.report()})")
+            return entry["deltas"]
+
+    def put(self, key: str, model: str, deltas: list[str]):
+        entry = {"created_at": time.time(), "model": model, "deltas": list(deltas)}
+        with self._lock:
+            self._remember(key, entry)
+        side_effects.submit(self._write, key, entry)
+
+    def _remember(self, key: str, entry: dict):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def _read(self, key: str) -> dict | None:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable LLM cache entry {path}: {e}")
+            self._remove(path)
+            return None
+        os.utime(path)  # The modification time orders eviction, like the in-memory LRU
+        return entry
+
+    def _write(self, key: str, entry: dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        with open(f"{path}.partial", "w") as f:
+            json.dump(entry, f)
+        os.replace(f"{path}.partial", path)
+        self._evict()
+
+    def _evict(self):
+        """Remove expired files, then the least recently used until under `max_disk_bytes`."""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # Expired and removed by `get` meanwhile
+                files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        now = time.time()
+        total_bytes = sum(size for _, size, _ in files)
+        for modified_at, size, path in files:
+            # A file last used more than the TTL ago was also created before that, so it expired
+            if total_bytes > self.max_disk_bytes or now - modified_at > self.ttl_seconds:
+                self._remove(path)
+                total_bytes -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, hit rate {self.hit_rate:.0%}"
+
+
+llm_cache = LLMResponseCache()
@@ -0,0 +1,107 @@
+import os
+import time
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Iterator
+
+from loguru import logger
+
+from voice_action_assistant.config import config
+from voice_action_assistant.metrics import metrics
+from voice_action_assistant.tracing import tracer
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+
+class OpenAIClientManager:
+    """
+    Owns the single OpenAI client of the process.
+
+    Every caller shares one HTTP connection pool, so after the first request (or a pre-connect)
+    chat, speech and transcription calls reuse a warm keep-alive connection instead of paying
+    for a new TCP and TLS handshake before the first token.
+    """
+
+    def __init__(self):
+        self._client: "OpenAI | None" = None
+        self._lock = Lock()
+
+    def get(self) -> "OpenAI":
+        with self._lock:
+            if self._client is None:
+                self._client = self._create_client()
+            return self._client
+
+    def _create_client(self) -> "OpenAI":
+        import httpx
+        from dotenv import load_dotenv
+        from openai import DefaultHttpxClient, OpenAI
+
+        load_dotenv()
+        http_client = DefaultHttpxClient(
+            limits=httpx.Limits(
+                max_connections=config.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=config.OPENAI_MAX_CONNECTIONS,
+                keepalive_expiry=config.OPENAI_KEEPALIVE_SECONDS,
+            ),
+        )
+        return OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url=config.OPENAI_BASE_URL,
+            timeout=httpx.Timeout(
+                config.OPENAI_TIMEOUT_SECONDS, connect=config.OPENAI_CONNECT_TIMEOUT_SECONDS
+            ),
+            max_retries=config.OPENAI_MAX_RETRIES,
+            http_client=http_client,
+        )
+
+    def preconnect(self):
+        """Open a pooled connection in the background so the next request skips the handshake."""
+
+        def connect():
+            try:
+                self.get().models.list()
+                logger.debug("OpenAI connection pool warmed up.")
+            except Exception as e:
+                logger.warning(f"Could not pre-connect to OpenAI: {e}")
+
+        Thread(target=connect, name="openai-preconnect", daemon=True).start()
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+client_manager = OpenAIClientManager()
+
+
+def get_client() -> "OpenAI":
+    return client_manager.get()
+
+
+def stream_text(completion, requested_at: float) -> Iterator[str]:
+    """
+    Yield the text deltas of a streamed chat completion and record its latency.
+
+    `requested_at` is the perf_counter() time the request was sent, so time to first token
+    includes the connection and the model's queueing, which is what the user waits for.
+    """
+    metrics.inc("llm_requests_total")
+    first_token_at = None
+    for chunk in completion:
+        str_delta = chunk.choices[0].delta.content
+        if not str_delta:
+            continue
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+            time_to_first_token = first_token_at - requested_at
+            logger.debug(f"LLM time to first token: {time_to_first_token:0.2f} seconds")
+            metrics.observe("llm_time_to_first_token_seconds", time_to_first_token)
+            tracer.record("llm_first_token", requested_at, first_token_at)
+        yield str_delta
+    finished_at = time.perf_counter()
+    metrics.observe("llm_response_seconds", finished_at - requested_at)
+    if first_token_at is not None:
+        tracer.record("llm_stream", first_token_at, finished_at)
@@ -1,29 +1,40 @@
+import argparse
 import os
 import signal
 import sys
-import threading
 import time
 from typing import Dict
 
+import yaml
 from loguru import logger
 
+from voice_action_assistant import IMPORT_STARTED_AT
+
 # Assuming the existence of Action classes in actions.py
 from voice_action_assistant.actions import Action, ActionFactory
 from voice_action_assistant.config import config
-from voice_action_assistant.recorder import AudioDetector, AudioRecorder
+from voice_action_assistant.keyword_spotter import create_keyword_spotter
+from voice_action_assistant.llm_client import client_manager
+from voice_action_assistant.matcher import PhraseMatcher
+from voice_action_assistant.metrics import MetricsExporter, metrics
+from voice_action_assistant.pipeline import (
+    BoundedQueue,
+    OverflowPolicy,
+    Pipeline,
+    SourceStage,
+    Stage,
+)
+from voice_action_assistant.profiling import startup_profile
+from voice_action_assistant.recorder import AudioDetector, AudioRecorder, create_vad
+from voice_action_assistant.side_effects import side_effects
+from voice_action_assistant.stt_backends import STT_BACKENDS
+from voice_action_assistant.tracing import load_trace_events, summarize, tracer
 from voice_action_assistant.transcriber import Transcriber
-from voice_action_assistant.utils import load_config_yml, play_sound, transcript_contains_phrase
+from voice_action_assistant.utils import load_config_yml, play_sound
+from voice_action_assistant.wake_window import Utterance, WakeWindowTranscriber
 
-# Start a new thread to play the startup audio
-threading.Thread(
-    target=play_sound,
-    args=(
-        os.path.join(
-            config.AUDIO_FILES_DIR,
-            "startup-audio.wav",
-        ),
-    ),
-).start()
+ACTIONS_CONFIG_FILE = "actions_config.yml"
+REQUIRED_ACTION_KEYS = ("name", "class", "start_phrase", "end_phrase", "prompt")
 
 
 def logger_init(level="INFO"):
@@ -35,34 +46,110 @@ def logger_init(level="INFO"):
     logger.add(sys.stderr, level=level)
 
 
-logger_init()
-
-
 class ActionController:
     def __init__(self):
         self.actions: Dict[str, Action] = {}
+        self.matcher = PhraseMatcher()
 
     def register_action(self, action: Action):
         self.actions[action.name] = action
+        for role, phrase in action.phrases():
+            self.matcher.add(action, role, phrase)
+
+    def phrases(self) -> list[str]:
+        return [phrase for action in self.actions.values() for _, phrase in action.phrases()]
 
     def check_and_perform_actions(self, transcription: str):
-        for action_name, action in self.actions.items():
-            logger.debug(f"Checking phrase: {action.phrase} in transcription: {transcription}")
-            if transcript_contains_phrase(transcription, action.phrase):
-                response = action.perform(transcription)
-                if response.success:
-                    return action_name
+        in_progress = [action for action in self.actions.values() if action.in_progress]
+        with tracer.span("match_phrases"):
+            matches = self.matcher.match(transcription, in_progress)
+        logger.debug(
+            f"Matched phrases in '{transcription}': "
+            f"{[(match.action.name, match.role.value) for match in matches]}"
+        )
+        for match in matches:
+            with tracer.span("perform", action=match.action.name, role=match.role.value):
+                response = match.action.perform(transcription, match.role)
+            if response.success:
+                return match.action.name
         return None
 
 
 class VoiceControlledRecorder:
+    """
+    Runs wake detection as a three stage pipeline, each stage on its own thread.
+
+    capture  waits for each hop of wake audio and passes on its stream position
+    asr      transcribes the wake window ending at that position (see WakeWindowTranscriber)
+    dispatch matches the transcript and performs the action
+
+    The capture to asr queue coalesces: when speech to text falls behind, only the newest
+    position waits, and the next decode simply covers more new audio. The asr to dispatch queue
+    blocks, so transcripts are never lost; while a long action runs, capture and speech to text
+    keep going and the next phrase is waiting as soon as the action returns. After an action
+    the audio up to the end of its phrase is marked consumed, so the same phrase cannot trigger
+    it a second time.
+    """
+
     def __init__(self):
-        self.wake_audio_recorder = AudioRecorder("wake phrase recorder", max_seconds=3)
+        self.wake_audio_recorder = AudioRecorder(
+            "wake phrase recorder", max_seconds=3, hop_seconds=config.WAKE_HOP_SECONDS
+        )
         self.recorder = AudioRecorder()
         self.transcriber = Transcriber()
-        self.audio_detector = AudioDetector(self.wake_audio_recorder, self.transcriber)
+        self.audio_detector = AudioDetector(
+            self.wake_audio_recorder,
+            self.transcriber,
+            vad=create_vad(),
+            spotter=create_keyword_spotter(ACTIONS_CONFIG_FILE),
+        )
+        self.wake_window = WakeWindowTranscriber(self.wake_audio_recorder, self.audio_detector)
         self.action_controller = ActionController()
         self.action_factory = ActionFactory()
+        self.metrics_exporter = MetricsExporter(metrics)
+
+        self.asr_queue = BoundedQueue(
+            "asr", config.PIPELINE_ASR_QUEUE_SIZE, OverflowPolicy.DROP_OLDEST
+        )
+        self.dispatch_queue = BoundedQueue(
+            "dispatch", config.PIPELINE_DISPATCH_QUEUE_SIZE, OverflowPolicy.BLOCK
+        )
+        self.pipeline = Pipeline(
+            [
+                SourceStage(
+                    "capture",
+                    self.wake_audio_recorder.wait_for_frame,
+                    lambda position: position,
+                    self.asr_queue,
+                ),
+                Stage("asr", self.wake_window.transcribe, self.asr_queue, self.dispatch_queue),
+                Stage("dispatch", self.dispatch, self.dispatch_queue),
+            ]
+        )
+
+    def dispatch(self, utterance: Utterance):
+        if utterance.start < self.wake_window.consumed_position:
+            return
+        # One trace per utterance, starting when its wake window was decoded
+        with tracer.interaction(
+            "utterance", started_at=utterance.decode_started_at or None
+        ) as trace:
+            if utterance.decode_started_at:
+                tracer.record(
+                    "detect_phrases", utterance.decode_started_at, utterance.decode_finished_at
+                )
+            with metrics.timer("action_dispatch_seconds"):
+                action_performed = self.action_controller.check_and_perform_actions(
+                    utterance.transcript
+                )
+            if trace is not None:
+                # Wake windows that triggered nothing would drown out the interactions
+                trace.keep = bool(action_performed)
+                trace.args.update(transcript=utterance.transcript, action=action_performed)
+        if action_performed:
+            metrics.inc("actions_performed_total")
+            self.wake_window.consume(utterance.end)
+            logger.info(f"Action '{action_performed}' is complete... Awaiting next command.")
 
     def load_actions_from_yaml(self, yaml_file: str):
         actions_config = load_config_yml(yaml_file)
@@ -75,38 +162,166 @@ class VoiceControlledRecorder:
                 logger.error(f"Failed to create action for {action_config['name']}")
 
     def register_actions(self):
-        self.load_actions_from_yaml("actions_config.yml")
+        self.load_actions_from_yaml(ACTIONS_CONFIG_FILE)
+        self.wake_window.fit_context(self.action_controller.phrases())
         self.action_factory.pretty_print_actions_to_console()
 
     def listen_and_respond(self):
         self.register_actions()
+        self.wake_audio_recorder.start_recording()
+        self.pipeline.start()
+        self.metrics_exporter.start()
         start_time = time.time()  # get the current time
-        while True:
-            if time.time() - start_time > 8 * 60 * 60:
-                logger.info("8 hours have passed, shutting down...")
-                break
-            transcription = self.audio_detector.detect_phrases(
-                listening_interval=0.5,
-            )
-            action_performed = self.action_controller.check_and_perform_actions(transcription)
-            if action_performed:
-                logger.info(
-                    f"Action '{action_performed}' is complete and signal queue is cleared... Awaiting next command."
-                )
-                self.audio_detector.recorder.refresh_signal_queue()
+        try:
+            while time.time() - start_time < 8 * 60 * 60:
+                time.sleep(config.PIPELINE_METRICS_LOG_SECONDS)
+                logger.debug(self.pipeline.report())
+                logger.debug(self.wake_decoding_report())
+            logger.info("8 hours have passed, shutting down...")
+        finally:
+            self.pipeline.stop()
+            self.metrics_exporter.stop()
+            logger.info(self.pipeline.report())
+            logger.info(self.wake_decoding_report())
+
+    def wake_decoding_report(self) -> str:
+        return (
+            f"Wake decoding: {self.wake_window.decoded_seconds_per_second:0.2f} seconds of audio "
+            f"per second ({'incremental' if self.wake_window.incremental else 'full window'}), "
+            f"{self.audio_detector.windows_skipped} windows skipped by the VAD"
+        )
+
+
+# Set by main() once the models are loaded, so exit_program can stop its pipeline
+voice_controlled_recorder: VoiceControlledRecorder | None = None
 
 
 def main():
+    # Plays in the background while the models load
+    play_sound(os.path.join(config.AUDIO_FILES_DIR, "startup-audio.wav"))
+    if config.OPENAI_PRECONNECT:
+        client_manager.preconnect()
+    global voice_controlled_recorder
     voice_controlled_recorder = VoiceControlledRecorder()
     voice_controlled_recorder.listen_and_respond()
 
 
 def exit_program():
-    play_sound(os.path.join(config.AUDIO_FILES_DIR, "shutdown-audio.wav"))
+    if voice_controlled_recorder is not None:
+        # Let a stop phrase that is being dispatched finish and submit its saves before draining
+        logger.info("Stopping the wake pipeline...")
+        voice_controlled_recorder.pipeline.stop()
+        voice_controlled_recorder.pipeline.join(timeout=config.SIDE_EFFECT_DRAIN_TIMEOUT_SECONDS)
+    logger.info("Waiting for background saves to finish...")
+    side_effects.drain(timeout=config.SIDE_EFFECT_DRAIN_TIMEOUT_SECONDS)
+    play_sound(os.path.join(config.AUDIO_FILES_DIR, "shutdown-audio.wav"), wait=True)
     sys.exit()
 
 
+def validate_actions_config(actions_config_file: str) -> list[str]:
+    """Return every problem found in the actions config, without loading any models."""
+    if not os.path.exists(actions_config_file):
+        return [f"{actions_config_file} not found, copy example_actions_config.yml to create it"]
+    try:
+        actions_config = load_config_yml(actions_config_file)
+    except yaml.YAMLError as e:
+        return [f"{actions_config_file} is not valid YAML: {e}"]
+    if not isinstance(actions_config, dict) or not isinstance(actions_config.get("actions"), list):
+        return [f"{actions_config_file} must contain a list under 'actions'"]
+
+    errors = []
+    action_classes = ActionFactory().action_classes
+    names, start_phrases = set(), set()
+    for index, action_config in enumerate(actions_config["actions"]):
+        label = f"Action {index + 1}"
+        if not isinstance(action_config, dict):
+            errors.append(f"{label} must be a mapping")
+            continue
+        label = f"Action '{action_config.get('name', index + 1)}'"
+        for key in REQUIRED_ACTION_KEYS:
+            if not action_config.get(key):
+                errors.append(f"{label} is missing '{key}'")
+        if action_config.get("class") and action_config["class"] not in action_classes:
+            errors.append(f"{label} has unknown class '{action_config['class']}'")
+        if action_config.get("name") in names:
+            errors.append(f"{label} is defined more than once")
+        names.add(action_config.get("name"))
+        start_phrase = str(action_config.get("start_phrase", "")).lower()
+        if start_phrase and start_phrase in start_phrases:
+            errors.append(f"{label} reuses the start phrase '{start_phrase}'")
+        start_phrases.add(start_phrase)
+    return errors
+
+
+def validate_config(args: argparse.Namespace) -> int:
+    # The settings themselves were already validated when config.py was imported
+    errors = validate_actions_config(ACTIONS_CONFIG_FILE)
+    backend = config.STT_BACKEND if config.LOCAL else "openai"
+    if backend not in STT_BACKENDS:
+        errors.append(f"Unknown STT_BACKEND '{backend}', choose from {sorted(STT_BACKENDS)}")
+    if config.KWS_ENABLED and not os.path.exists(config.KWS_TEMPLATES_FILE):
+        errors.append(f"KWS_ENABLED is set but {config.KWS_TEMPLATES_FILE} does not exist")
+
+    for error in errors:
+        logger.error(error)
+    if not errors:
+        logger.info("Settings and actions config are valid.")
+    return 1 if errors else 0
+
+
+def list_actions(args: argparse.Namespace) -> int:
+    errors = validate_actions_config(ACTIONS_CONFIG_FILE)
+    if errors:
+        for error in errors:
+            logger.error(error)
+        return 1
+    action_factory = ActionFactory()
+    action_factory.loaded_actions.extend(load_config_yml(ACTIONS_CONFIG_FILE)["actions"])
+    print(action_factory.generate_table())
+    return 0
+
+
+def print_settings(args: argparse.Namespace) -> int:
+    print(yaml.safe_dump(config.model_dump(), sort_keys=False), end="")
+    return 0
+
+
+def print_trace_summary(args: argparse.Namespace) -> int:
+    print(summarize(load_trace_events(config.TRACE_FILE), last=args.last))
+    return 0
+
+
+COMMANDS = {
+    "list-actions": (list_actions, "Print the actions in actions_config.yml"),
+    "validate-config": (validate_config, "Check the settings and actions config and exit"),
+    "settings": (print_settings, "Print the effective settings"),
+    "traces": (print_trace_summary, "Summarize where the time went in recent interactions"),
+}
+
+
 def run():
+    parser = argparse.ArgumentParser(description="Voice-activated assistant")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report how long imports, model loading and the first inference take",
+    )
+    subparsers = parser.add_subparsers(
+        dest="command", metavar="command", help="Run a command instead of listening"
+    )
+    for name, (_, help_text) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text)
+    subparsers.choices["traces"].add_argument(
+        "--last", type=int, default=20, help="Number of recent interactions to summarize"
+    )
+    args = parser.parse_args()
+
+    logger_init()
+    if args.command:
+        sys.exit(COMMANDS[args.command][0](args))
+
+    startup_profile.enabled = args.profile_startup
+    startup_profile.record("import", time.perf_counter() - IMPORT_STARTED_AT)
     logger.info("Starting voice-controlled recorder...")
     signal.signal(signal.SIGTERM, lambda signum, frame: exit_program())
     signal.signal(signal.SIGINT, lambda signum, frame: exit_program())
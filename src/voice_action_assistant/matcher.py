@@ -0,0 +1,76 @@
+import re
+from enum import Enum
+from typing import Any, NamedTuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class PhraseRole(str, Enum):
+    START = "start"
+    STOP = "stop"
+
+
+class PhraseMatch(NamedTuple):
+    action: Any
+    role: PhraseRole
+    phrase: str
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class _TrieNode:
+    __slots__ = ("children", "matches")
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        self.matches: list[PhraseMatch] = []
+
+
+class PhraseMatcher:
+    """
+    Matches every configured phrase against the end of a transcript in a single pass.
+
+    Phrases are normalised to word tokens and stored in a trie keyed on their tokens in reverse,
+    so walking the transcript backwards from its last word visits every phrase that ends the
+    transcript. The walk costs at most one dict lookup per word of the longest phrase, no matter
+    how many actions are registered.
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def add(self, action: Any, role: PhraseRole, phrase: str):
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = self._root
+        for token in reversed(tokens):
+            node = node.children.setdefault(token, _TrieNode())
+        node.matches.append(PhraseMatch(action, role, phrase))
+
+    def match(self, transcript: str, in_progress: list[Any] | None = None) -> list[PhraseMatch]:
+        """
+        Return the matches for a transcript, longest phrase first.
+
+        While any action is in progress only the stop phrases of those actions are considered;
+        otherwise only start phrases are.
+        """
+        matches = []
+        node = self._root
+        for token in reversed(tokenize(transcript)):
+            node = node.children.get(token)
+            if node is None:
+                break
+            matches.extend(node.matches)
+
+        if in_progress:
+            matches = [
+                match
+                for match in matches
+                if match.role == PhraseRole.STOP and match.action in in_progress
+            ]
+        else:
+            matches = [match for match in matches if match.role == PhraseRole.START]
+        return matches[::-1]
@@ -0,0 +1,270 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from loguru import logger
+
+from voice_action_assistant.config import config
+
+# Upper bounds in seconds, from a wake window decode to a long dictation or LLM answer
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Counter:
+    """A value that only goes up, such as the number of actions performed."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+    def prometheus_lines(self) -> list[str]:
+        return [f"{self.name} {self.value}"]
+
+
+class Gauge(Counter):
+    """A value that can go up and down, such as a queue depth."""
+
+    kind = "gauge"
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Histogram:
+    """
+    Counts observations in fixed buckets, so percentiles over a whole day cost constant memory.
+
+    Percentiles are estimated by interpolating inside the bucket they fall in, which is as
+    precise as the buckets and plenty to see whether p95 latency moved.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str = "", buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # The last one is the +Inf bucket
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    def percentile(self, percent: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = self.count * percent / 100
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = (
+                    min(self.buckets[index], self.max) if index < len(self.buckets) else self.max
+                )
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.max,
+        }
+
+    def prometheus_lines(self) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters, gauges and histograms, looked up by name.
+
+    When disabled, `timed` and `timer` only write their debug log line and nothing is recorded,
+    so instrumented code costs one attribute check per call.
+    """
+
+    def __init__(self, enabled: bool = config.METRICS_ENABLED):
+        self.enabled = enabled
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, metric_class, name: str, help_text: str):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(name, metric_class(name, help_text))
+        if not isinstance(metric, metric_class) or metric.kind != metric_class.kind:
+            raise ValueError(f"Metric {name} is a {metric.kind}, not a {metric_class.kind}")
+        return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        return self._get(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str = "") -> Histogram:
+        return self._get(Histogram, name, help_text)
+
+    def inc(self, name: str, amount: float = 1.0):
+        if self.enabled:
+            self.counter(name).inc(amount)
+
+    def set(self, name: str, value: float):
+        if self.enabled:
+            self.gauge(name).set(value)
+
+    def observe(self, name: str, value: float):
+        if self.enabled:
+            self.histogram(name).observe(value)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Observe how long the block took, in seconds, in the `name` histogram."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            logger.debug(f"{name} took {elapsed:0.3f} seconds")
+            self.observe(name, elapsed)
+
+    def timed(self, name: str) -> Callable:
+        """Decorator version of `timer`."""
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def snapshot(self) -> dict:
+        return {name: metric.snapshot() for name, metric in sorted(self._metrics.items())}
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            if metric.help_text:
+                lines.append(f"# HELP {name} {metric.help_text}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.prometheus_lines())
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, file_name: str):
+        # Written to a temporary file first so readers never see half a snapshot
+        partial_file = f"{file_name}.partial"
+        with open(partial_file, "w") as f:
+            json.dump({"timestamp": time.time(), "metrics": self.snapshot()}, f, indent=2)
+        os.replace(partial_file, file_name)
+
+
+class MetricsExporter:
+    """Writes a JSON snapshot every METRICS_SNAPSHOT_SECONDS and optionally serves /metrics."""
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        snapshot_file: str | None = config.METRICS_SNAPSHOT_FILE,
+        interval_seconds: float = config.METRICS_SNAPSHOT_SECONDS,
+        http_port: int | None = config.METRICS_HTTP_PORT,
+    ):
+        self.registry = registry
+        self.snapshot_file = snapshot_file
+        self.interval_seconds = interval_seconds
+        self.http_port = http_port
+        self._stop_event = threading.Event()
+        self._server: ThreadingHTTPServer | None = None
+
+    def start(self):
+        if not self.registry.enabled:
+            return
+        if self.snapshot_file:
+            threading.Thread(target=self._write_loop, name="metrics-snapshot", daemon=True).start()
+        if self.http_port:
+            self._start_http_server()
+
+    def _write_loop(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        try:
+            self.registry.write_snapshot(self.snapshot_file)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot to {self.snapshot_file}: {e}")
+
+    def _start_http_server(self):
+        registry = self.registry
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        # Only bound to localhost: the metrics include nothing a remote scraper needs
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.http_port), MetricsHandler)
+        threading.Thread(
+            target=self._server.serve_forever, name="metrics-http", daemon=True
+        ).start()
+        logger.info(f"Serving metrics on http://127.0.0.1:{self.http_port}/metrics")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._server is not None:
+            self._server.shutdown()
+        if self.registry.enabled and self.snapshot_file:
+            self._write_snapshot()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,137 @@
+import re
+import time
+
+from loguru import logger
+
+from voice_action_assistant.config import config
+from voice_action_assistant.side_effects import append_to_file, side_effects
+from voice_action_assistant.utils import StreamColorPrinter, copy_to_clipboard, python_printer
+
+
+class SinkTarget:
+    """One destination of a streamed LLM response."""
+
+    def write(self, text: str):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self, full_text: str):
+        self.flush()
+
+
+class FileTarget(SinkTarget):
+    """Keeps the file open for the whole stream and relies on buffered IO between flushes."""
+
+    def __init__(self, file_name: str, mode: str = "a", header: str = ""):
+        self.file = open(file_name, mode)
+        if header:
+            self.file.write(header)
+
+    def write(self, text: str):
+        self.file.write(text)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self, full_text: str):
+        self.file.close()
+
+
+class LogTarget(SinkTarget):
+    """
+    Appends the finished response to a log file on the side effect worker.
+
+    Going through the worker keeps the entry after the transcript it answers, which is queued
+    on the same worker before the LLM call starts.
+    """
+
+    def __init__(self, file_name: str, header: str = ""):
+        self.file_name = file_name
+        self.header = header
+
+    def close(self, full_text: str):
+        side_effects.submit(append_to_file, self.file_name, self.header + full_text)
+
+
+class PrinterTarget(SinkTarget):
+    """Prints every delta straight away, so the console stays live."""
+
+    def __init__(self, printer: StreamColorPrinter = python_printer):
+        self.printer = printer
+
+    def write(self, text: str):
+        self.printer.print(text)
+
+
+class ClipboardTarget(SinkTarget):
+    """Copies the finished response, or only its code blocks when EXTRACT_CODE_BLOCKS is set."""
+
+    def __init__(self, extract_code_blocks: bool | None = None):
+        # Read when the response starts, so a change from the settings action applies
+        if extract_code_blocks is None:
+            extract_code_blocks = config.EXTRACT_CODE_BLOCKS
+        self.extract_code_blocks = extract_code_blocks
+
+    def close(self, full_text: str):
+        try:
+            copy_to_clipboard(full_text)
+            if self.extract_code_blocks:
+                code_blocks = re.findall(r"```.*?\n(.*?)```", full_text, re.DOTALL)
+                print("Code Blocks: ", code_blocks)
+                if code_blocks:
+                    copy_to_clipboard("\n---\n".join(code_blocks))
+        except Exception as e:
+            logger.error(e)
+
+
+class StreamingOutputSink:
+    """
+    Fans streamed LLM deltas out to several targets, writing each delta to each target once.
+
+    Targets are flushed at most every `flush_interval_seconds` and once more when the sink is
+    closed, at which point targets that need the whole response (like the clipboard) get it.
+    """
+
+    def __init__(
+        self,
+        targets: list[SinkTarget],
+        flush_interval_seconds: float | None = None,
+    ):
+        self.targets = targets
+        if flush_interval_seconds is None:
+            flush_interval_seconds = config.STREAM_FLUSH_INTERVAL_SECONDS
+        self.flush_interval_seconds = flush_interval_seconds
+        self.parts: list[str] = []
+        self._last_flush = time.perf_counter()
+
+    def __enter__(self) -> "StreamingOutputSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def write(self, delta: str):
+        self.parts.append(delta)
+        for target in self.targets:
+            target.write(delta)
+        now = time.perf_counter()
+        if now - self._last_flush >= self.flush_interval_seconds:
+            self.flush()
+            self._last_flush = now
+
+    def flush(self):
+        for target in self.targets:
+            target.flush()
+
+    def close(self) -> str:
+        full_text = self.text
+        for target in self.targets:
+            target.close(full_text)
+        self.targets = []
+        return full_text
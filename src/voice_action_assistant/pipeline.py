@@ -0,0 +1,245 @@
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Generic, NamedTuple, TypeVar
+
+import numpy as np
+from loguru import logger
+
+T = TypeVar("T")
+
+
+class OverflowPolicy(str, Enum):
+    BLOCK = "block"  # The producer waits, pushing back on the stage before it
+    DROP_OLDEST = "drop_oldest"  # Coalesce: the newest item replaces the oldest queued one
+    DROP_NEWEST = "drop_newest"  # The incoming item is discarded
+
+
+class QueuedItem(NamedTuple):
+    value: Any
+    enqueued_at: float
+
+
+class BoundedQueue(Generic[T]):
+    """A bounded FIFO between two stages with an explicit policy for when it is full."""
+
+    def __init__(self, name: str, maxsize: int, policy: OverflowPolicy = OverflowPolicy.BLOCK):
+        if maxsize <= 0:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.max_depth = 0
+        self._items: deque[QueuedItem] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, value: T):
+        with self._condition:
+            if len(self._items) >= self.maxsize:
+                if self.policy == OverflowPolicy.DROP_NEWEST:
+                    self.dropped += 1
+                    return
+                if self.policy == OverflowPolicy.DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    self._condition.wait_for(
+                        lambda: len(self._items) < self.maxsize or self._closed
+                    )
+            if self._closed:
+                return
+            self._items.append(QueuedItem(value, time.perf_counter()))
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._condition.notify_all()
+
+    def get(self, timeout: float | None = None) -> QueuedItem | None:
+        """Return the oldest item, or None on timeout or once the queue is closed and empty."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._condition.notify_all()
+            return item
+
+    def clear(self) -> int:
+        with self._condition:
+            n_items = len(self._items)
+            self._items.clear()
+            self._condition.notify_all()
+            return n_items
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class StageMetrics:
+    """Throughput and latency of one stage, over a window of the most recent items."""
+
+    def __init__(self, window: int = 500):
+        self.processed = 0
+        self.failed = 0
+        self.wait_seconds: deque[float] = deque(maxlen=window)
+        self.service_seconds: deque[float] = deque(maxlen=window)
+
+    def record(self, wait_seconds: float, service_seconds: float):
+        self.processed += 1
+        self.wait_seconds.append(wait_seconds)
+        self.service_seconds.append(service_seconds)
+
+    @staticmethod
+    def _percentiles(values: deque[float]) -> dict[str, float]:
+        if not values:
+            return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        p50, p95 = np.percentile(values, [50, 95]) * 1000
+        return {"p50_ms": float(p50), "p95_ms": float(p95), "max_ms": max(values) * 1000}
+
+    def snapshot(self) -> dict:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "queue_wait": self._percentiles(self.wait_seconds),
+            "service": self._percentiles(self.service_seconds),
+        }
+
+
+class Stage:
+    """
+    A worker thread that takes items from its input queue and hands results to the next one.
+
+    The handler returns the value to pass on, or None to pass nothing (for example a wake
+    window without speech). Time spent waiting in the input queue and time spent in the handler
+    are recorded separately, so a slow stage is easy to tell apart from a backed up one.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Any],
+        input_queue: BoundedQueue | None,
+        output_queue: BoundedQueue | None = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.metrics = StageMetrics()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"stage-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.input_queue is not None:
+            self.input_queue.close()
+
+    def join(self, timeout: float | None = None):
+        """Wait for the item being processed, e.g. an action being performed, to finish."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            item = self.input_queue.get(timeout=0.5)
+            if item is not None:
+                self._process(item.value, item.enqueued_at)
+
+    def _process(self, value: Any, enqueued_at: float):
+        started_at = time.perf_counter()
+        try:
+            result = self.handler(value)
+        except Exception as e:
+            self.metrics.failed += 1
+            logger.exception(f"Pipeline stage {self.name} failed: {e}")
+            return
+        finished_at = time.perf_counter()
+        self.metrics.record(started_at - enqueued_at, finished_at - started_at)
+        if result is not None and self.output_queue is not None:
+            self.output_queue.put(result)
+
+    def snapshot(self) -> dict:
+        snapshot = {
+            **self.metrics.snapshot(),
+            "queue_depth": 0,
+            "queue_max_depth": 0,
+            "dropped": 0,
+        }
+        if self.input_queue is not None:
+            snapshot["queue_depth"] = len(self.input_queue)
+            snapshot["queue_max_depth"] = self.input_queue.max_depth
+            snapshot["dropped"] = self.input_queue.dropped
+        return snapshot
+
+
+class SourceStage(Stage):
+    """
+    The first stage: takes its items from `read(timeout)` instead of an input queue.
+
+    `read` blocks until an event arrives (a captured audio hop) and returns None on timeout, so
+    the stage only wakes up when there is work.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        read: Callable[[float], Any],
+        handler: Callable[[Any], Any],
+        output_queue: BoundedQueue,
+    ):
+        super().__init__(name, handler, None, output_queue)
+        self.read = read
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            value = self.read(0.5)
+            if value is not None:
+                self._process(value, time.perf_counter())
+
+
+class Pipeline:
+    """Stages connected by bounded queues, started and stopped together."""
+
+    def __init__(self, stages: list[Stage]):
+        self.stages = stages
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self):
+        for stage in self.stages:
+            stage.stop()
+
+    def join(self, timeout: float | None = None):
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for stage in self.stages:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            stage.join(remaining)
+
+    def metrics(self) -> dict[str, dict]:
+        return {stage.name: stage.snapshot() for stage in self.stages}
+
+    def report(self) -> str:
+        lines = ["Pipeline stages:"]
+        for name, stage in self.metrics().items():
+            lines.append(
+                f"  {name:<10} processed {stage['processed']:>6}  "
+                f"dropped {stage['dropped']:>5}  "
+                f"depth {stage['queue_depth']}/{stage['queue_max_depth']}  "
+                f"wait p95 {stage['queue_wait']['p95_ms']:>7.1f} ms  "
+                f"service p50/p95 {stage['service']['p50_ms']:>7.1f}/"
+                f"{stage['service']['p95_ms']:.1f} ms"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,41 @@
+import time
+from contextlib import contextmanager
+
+from loguru import logger
+
+from voice_action_assistant import IMPORT_STARTED_AT
+
+
+class StartupProfile:
+    """Collects how long each startup phase took, reported by `va --profile-startup`."""
+
+    def __init__(self):
+        self.enabled = False
+        self.phases: dict[str, float] = {}
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start_time)
+
+    def report(self) -> str:
+        total = time.perf_counter() - IMPORT_STARTED_AT
+        width = max([len(name) for name in self.phases] + [len("ready to listen")])
+        lines = ["Startup profile:"]
+        for name, seconds in self.phases.items():
+            lines.append(f"  {name:<{width}} {seconds:>7.2f} s")
+        lines.append(f"  {'ready to listen':<{width}} {total:>7.2f} s")
+        return "\n".join(lines)
+
+    def log_report(self):
+        if self.enabled:
+            logger.info(self.report())
+
+
+startup_profile = StartupProfile()
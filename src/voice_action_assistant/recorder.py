@@ -1,41 +1,105 @@
 import os
-import tempfile
-import time
-from collections import deque
+import queue
+import subprocess
+import wave
 
 import numpy as np
-import sounddevice as sd
 from loguru import logger
-from pydub import AudioSegment
-from scipy.io.wavfile import write
 
+from voice_action_assistant.audio_buffer import AudioRingBuffer
 from voice_action_assistant.config import config
+from voice_action_assistant.keyword_spotter import KeywordSpotter
+from voice_action_assistant.metrics import metrics
+from voice_action_assistant.tracing import tracer
 from voice_action_assistant.transcriber import Transcriber
-from voice_action_assistant.utils import timer_decorator
 
 
 class AudioRecorder:
-    def __init__(self, name="AudioRecorder", max_seconds=config.MAX_AUDIO_LENGTH_SECONDS):
+    """
+    Records the microphone into a ring buffer and announces every captured frame.
+
+    With `hop_seconds` set, the sounddevice callback delivers fixed-size frames of that length.
+    After each frame is written to `signal_buffer`, its end stream position goes onto the
+    `frames` queue, so consumers block on `wait_for_frame` instead of polling the clock. The
+    audio itself stays in the ring buffer and is never copied into the queue.
+    """
+
+    def __init__(
+        self,
+        name="AudioRecorder",
+        max_seconds=config.MAX_AUDIO_LENGTH_SECONDS,
+        hop_seconds: float | None = None,
+        max_queued_frames: int = 64,
+    ):
+        import sounddevice as sd
+
         self.name = name
         self.max_seconds = max_seconds
         self.is_recording = False
 
         self.fs = 16000  # Sample rate 16000 for whisper model!
         self.channels = 1  # Number of audio channels
+        self.signal_buffer = AudioRingBuffer(int(self.max_seconds * self.fs))
+        self.hop_samples = int(hop_seconds * self.fs) if hop_seconds else 0
+        self.frames: queue.Queue[int] = queue.Queue(maxsize=max_queued_frames)
         self.stream = sd.InputStream(
-            samplerate=self.fs, channels=self.channels, callback=self.audio_callback
+            samplerate=self.fs,
+            channels=self.channels,
+            blocksize=self.hop_samples,  # 0 lets PortAudio pick a variable size
+            callback=self.audio_callback,
         )
 
     def refresh_signal_queue(self):
-        array_size = self.max_seconds * self.fs
-        logger.debug(f"Array size: {array_size}")
-        self.signal_queue = deque(maxlen=array_size)
+        logger.debug(f"Array size: {self.signal_buffer.capacity}")
+        self.signal_buffer.reset()
+        self._clear_frames()
+
+    def _clear_frames(self):
+        while True:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                return
 
     def audio_callback(self, indata, frames, time, status):
         if status:
             print(status)
         if self.is_recording:
-            self.signal_queue.extend(indata.copy())
+            self.signal_buffer.write(indata[:, 0])
+            self._publish_frame(self.signal_buffer.total_written)
+
+    def _publish_frame(self, position: int):
+        # Never block the audio thread; when nobody is consuming, the oldest position goes
+        try:
+            self.frames.put_nowait(position)
+        except queue.Full:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                pass
+            self.frames.put_nowait(position)
+
+    def wait_for_frame(self, timeout: float | None = None) -> int | None:
+        """
+        Block until a new frame has been captured and return the newest stream position.
+
+        Frames that arrived while the caller was busy are coalesced into the newest one, so a
+        slow consumer skips ahead instead of falling further behind. Returns None on timeout.
+        """
+        try:
+            position = self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        coalesced = 0
+        while True:
+            try:
+                position = self.frames.get_nowait()
+                coalesced += 1
+            except queue.Empty:
+                break
+        if coalesced:
+            logger.debug(f"{self.name}: coalesced {coalesced} frames captured while busy")
+        return position
 
     def start_recording(self):
         if not self.is_recording:
@@ -54,69 +118,215 @@ class AudioRecorder:
     def record_chunk(self, chunk_length=15):
         """Record a single chunk of audio."""
         self.start_recording()
-        start_time = time.time()
-
-        while time.time() - start_time < chunk_length:
-            time.sleep(0.1)
-
+        target = int(chunk_length * self.fs)
+        while self.signal_buffer.total_written < target:
+            self.wait_for_frame()
         return self.stop_recording()
 
     @property
-    def signal_array(self):
-        signal = np.concatenate(list(self.signal_queue)).flatten()
-        logger.debug(f"Len signal queue: {len(self.signal_queue)} ~= len array: {signal.shape}?")
-        return signal
+    def signal_array(self) -> np.ndarray:
+        return self.signal_buffer.snapshot()
+
+    def latest(self, seconds: float) -> np.ndarray:
+        return self.signal_buffer.latest(int(seconds * self.fs))
 
-    @timer_decorator
+    @metrics.timed("process_recording_seconds")
+    @tracer.traced("process_recording")
     def process_recording(self) -> np.ndarray:
-        logger.debug(f"Data shape: {self.signal_array.shape}")
-        return self.signal_array
+        signal = self.signal_buffer.snapshot()
+        logger.debug(f"Data shape: {signal.shape}")
+        return signal
 
-    @timer_decorator
-    def save_recording(self, file_name: str):
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
-            temp_wav_path = temp_wav.name
+    @metrics.timed("save_recording_seconds")
+    @tracer.traced("save_recording")
+    def save_recording(self, file_name: str, audio: np.ndarray | None = None):
+        """
+        Encode audio (the current recording by default) straight from memory.
 
-        try:
-            logger.debug(f"Writing data to temporary wav file: {temp_wav_path}")
-            # Write data to the temporary wav file
-            write(temp_wav_path, self.fs, self.signal_array)
+        WAV is written directly; other formats pipe the pcm into ffmpeg's stdin, so no
+        intermediate WAV file is written (pydub's export writes one and runs ffmpeg on it).
+        """
+        if audio is None:
+            audio = self.signal_array
+        audio_format = os.path.splitext(file_name)[1].lstrip(".") or "mp3"
+
+        logger.debug(f"Encoding {len(audio) / self.fs:0.1f} seconds of audio as {file_name}")
+        pcm = (np.clip(audio, -1.0, 1.0) * (2**15 - 1)).astype(np.int16).tobytes()
+        if audio_format == "wav":
+            with wave.open(file_name, "wb") as f:
+                f.setnchannels(self.channels)
+                f.setsampwidth(2)
+                f.setframerate(self.fs)
+                f.writeframes(pcm)
+            return
+
+        codec = ["-c:a", "libopus"] if audio_format == "opus" else []
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "s16le", "-ar", str(self.fs)]
+            + ["-ac", str(self.channels), "-i", "pipe:0", *codec, file_name],
+            input=pcm,
+            check=True,
+            capture_output=True,
+        )
+
+
+class VoiceActivityDetector:
+    """Decides whether a window of audio contains speech before it is sent to Whisper."""
+
+    def is_speech(self, audio: np.ndarray, fs: int) -> bool:
+        raise NotImplementedError
+
+
+class EnergyVAD(VoiceActivityDetector):
+    """
+    Frame-level RMS energy and zero-crossing rate baseline.
 
-            logger.debug("Loading temporary wav file into an AudioSegment")
-            # Load the temporary wav file into an AudioSegment
-            audio: AudioSegment = AudioSegment.from_wav(temp_wav_path)
+    A frame counts as speech when it is loud enough and its zero-crossing rate is low enough to
+    rule out broadband hiss. The window counts as speech when enough frames are speech.
+    """
 
-            logger.debug(f"Exporting AudioSegment as an mp3: {file_name}")
-            # Export the AudioSegment as an mp3
-            audio.export(file_name, format="mp3")
-        finally:
-            logger.debug(f"Deleting temporary file: {temp_wav_path}")
-            # Delete the temporary file
-            os.remove(temp_wav_path)
+    def __init__(
+        self,
+        energy_threshold: float = 0.01,
+        zcr_threshold: float = 0.35,
+        min_speech_ratio: float = 0.05,
+        frame_seconds: float = 0.03,
+    ):
+        self.energy_threshold = energy_threshold
+        self.zcr_threshold = zcr_threshold
+        self.min_speech_ratio = min_speech_ratio
+        self.frame_seconds = frame_seconds
+
+    def speech_frames(self, audio: np.ndarray, fs: int) -> np.ndarray:
+        """Return one boolean per `frame_seconds` frame, True where the frame is speech."""
+        frame_length = int(self.frame_seconds * fs)
+        n_frames = len(audio) // frame_length
+        frames = audio[: n_frames * frame_length].reshape(n_frames, frame_length)
+
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+        return (rms > self.energy_threshold) & (zcr < self.zcr_threshold)
+
+    def is_speech(self, audio: np.ndarray, fs: int) -> bool:
+        speech_frames = self.speech_frames(audio, fs)
+        if len(speech_frames) == 0:
+            return False
+        return bool(np.mean(speech_frames) >= self.min_speech_ratio)
+
+
+class SileroVAD(VoiceActivityDetector):
+    """Model-based detector using Silero VAD from torch hub (downloaded on first use)."""
+
+    chunk_size = 512  # Silero expects 512 sample chunks at 16 kHz
+
+    def __init__(self, threshold: float = 0.5):
+        import torch
+
+        self.torch = torch
+        self.threshold = threshold
+        self.model, _ = torch.hub.load("snakers4/silero-vad", "silero_vad", trust_repo=True)
+
+    def is_speech(self, audio: np.ndarray, fs: int) -> bool:
+        self.model.reset_states()
+        with self.torch.no_grad():
+            for start in range(0, len(audio) - self.chunk_size + 1, self.chunk_size):
+                chunk = self.torch.from_numpy(audio[start : start + self.chunk_size].copy())
+                if self.model(chunk, fs).item() >= self.threshold:
+                    return True
+        return False
+
+
+def create_vad() -> VoiceActivityDetector | None:
+    if not config.VAD_ENABLED:
+        return None
+    if config.VAD_BACKEND == "energy":
+        return EnergyVAD(
+            energy_threshold=config.VAD_ENERGY_THRESHOLD,
+            zcr_threshold=config.VAD_ZCR_THRESHOLD,
+            min_speech_ratio=config.VAD_MIN_SPEECH_RATIO,
+        )
+    if config.VAD_BACKEND == "silero":
+        return SileroVAD(threshold=config.VAD_SILERO_THRESHOLD)
+    raise ValueError(f"Unknown VAD backend: {config.VAD_BACKEND}")
 
 
 class AudioDetector:
-    def __init__(self, recorder: AudioRecorder, transcriber: Transcriber):
+    def __init__(
+        self,
+        recorder: AudioRecorder,
+        transcriber: Transcriber,
+        vad: VoiceActivityDetector | None = None,
+        spotter: KeywordSpotter | None = None,
+        hangover_windows: int = config.VAD_HANGOVER_WINDOWS,
+    ):
         self.recorder = recorder
         self.transcriber = transcriber
+        self.vad = vad
+        self.spotter = spotter
+        self.hangover_windows = hangover_windows
+        self.hangover_remaining = 0
+        # Shorter windows cannot hold a phrase and are not worth a model call
+        self.min_window_samples = int(0.3 * recorder.fs)
+        self.windows_skipped = 0
+        self.windows_transcribed = 0
+        self.windows_rejected_by_spotter = 0
+        self.decoded_samples = 0  # Audio actually sent to the speech to text model
 
-    def detect_phrases(
-        self,
-        listening_interval: float,
-        pre_audio_file: str = "",
-    ):
+    def should_transcribe(self, audio_chunk: np.ndarray) -> bool:
+        if self.vad is None:
+            return True
+        if self.vad.is_speech(audio_chunk, self.recorder.fs):
+            self.hangover_remaining = self.hangover_windows
+            return True
+        if self.hangover_remaining > 0:
+            self.hangover_remaining -= 1
+            return True
+        return False
+
+    def spotted_candidates(self, audio_chunk: np.ndarray) -> bool:
+        if self.spotter is None:
+            return True
+        candidates = self.spotter.detect(audio_chunk)
+        if candidates:
+            logger.debug(f"Keyword spotter candidates: {candidates}")
+            return True
+        self.windows_rejected_by_spotter += 1
+        return False
+
+    def detect_phrases(self, pre_audio_file: str = "", timeout: float | None = None) -> str:
+        """
+        Wait for the next captured hop and transcribe the wake window that ends with it.
+
+        Returns "" when the window is skipped or no hop arrives within `timeout`.
+        """
         if not self.recorder.is_recording:
             logger.debug("Starting wake recorder...")
             self.recorder.start_recording()
 
-        start_time = time.time()
-        while time.time() - start_time < listening_interval:
-            time.sleep(0.1)
+        if self.recorder.wait_for_frame(timeout) is None:
+            return ""
 
         logger.debug(f"max seconds: {self.recorder.max_seconds}, fs: {self.recorder.fs}")
-        array_size = int(self.recorder.max_seconds * self.recorder.fs)
-        logger.debug(f"Array size: {array_size} of possible {len(self.recorder.signal_array)}")
-        audio_chunk = self.recorder.signal_array[-array_size:]
+        return self.transcribe_window(
+            self.recorder.latest(self.recorder.max_seconds), pre_audio_file
+        )
+
+    def transcribe_window(self, audio_chunk: np.ndarray, pre_audio_file: str = "") -> str:
+        """Transcribe one wake window, or return "" when the VAD or keyword spotter skip it."""
+        logger.debug(
+            f"Audio chunk size: {len(audio_chunk)} of {self.recorder.signal_buffer.capacity}"
+        )
+        if not self.should_transcribe(audio_chunk):
+            self.windows_skipped += 1
+            logger.debug(
+                f"No speech detected, skipped {self.windows_skipped} windows "
+                f"(transcribed {self.windows_transcribed})"
+            )
+            return ""
+        if not self.spotted_candidates(audio_chunk):
+            return ""
+
+        self.windows_transcribed += 1
+        self.decoded_samples += len(audio_chunk)
         transcription = self.transcriber.transcribe_audio(audio_chunk, pre_audio_file).lower()
         return transcription
@@ -0,0 +1,190 @@
+import re
+import types
+from collections.abc import Collection
+from typing import Any, Literal, NamedTuple, Union, get_args, get_origin
+
+from loguru import logger
+from pydantic import TypeAdapter, ValidationError
+
+from voice_action_assistant.config import Settings
+from voice_action_assistant.metrics import metrics
+
+VIEW_PATTERN = re.compile(
+    r"\b(show|view|list|print|display|read|what are)\b.*\b(settings?|config|configuration)\b"
+)
+ENABLE_WORDS = {"enable", "activate", "on", "start", "use"}
+DISABLE_WORDS = {"disable", "deactivate", "off", "stop", "don't", "dont"}
+# Words in field names that say nothing about which setting is meant
+FIELD_FILLER_WORDS = {"use", "enabled", "to", "of", "is"}
+COMMAND_FILLER_WORDS = {"set", "change", "make", "update", "turn", "switch", "the", "please"}
+NONE_WORDS = {"none", "null", "nothing", "default"}
+SCALAR_TYPES = (bool, int, float, str)
+VALUE_SEPARATOR = re.compile(r"\s+to\s+", re.IGNORECASE)
+# Settings read whenever they are used. The others are read at import or when the recorder,
+# transcriber or actions are built, so changing them while running would do nothing.
+RUNTIME_SETTINGS = frozenset(
+    {
+        "MODEL_ID",
+        "COPY_TO_CLIPBOARD",
+        "EXTRACT_CODE_BLOCKS",
+        "PASTE_AT_CURSOR",
+        "USE_TTS",
+        "TTS_STREAMING",
+        "TTS_MODEL",
+        "TTS_VOICE",
+        "AUDIO_SPEED",
+        "LLM_CACHE_ENABLED",
+        "RECORDING_FORMAT",
+        "RECORDINGS_ARCHIVE_DIR",
+        "STREAM_FLUSH_INTERVAL_SECONDS",
+    }
+)
+
+
+class SettingsCommand(NamedTuple):
+    view: bool = False
+    updates: dict[str, Any] = {}
+
+
+def _base_types(annotation) -> tuple[list, bool]:
+    """The non-None types of a field annotation, and whether None is allowed."""
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = get_args(annotation)
+        return [arg for arg in args if arg is not type(None)], type(None) in args
+    return [annotation], False
+
+
+class _Field(NamedTuple):
+    name: str
+    words: frozenset[str]
+    types: list
+    optional: bool
+    adapter: TypeAdapter
+
+    @property
+    def is_bool(self) -> bool:
+        return self.types == [bool]
+
+
+class SettingsCommandParser:
+    """
+    Resolves common settings commands locally, without a round trip to the LLM.
+
+    The vocabulary is built from the `Settings` fields in RUNTIME_SETTINGS, further limited to
+    `attributes` (the settings the LLM path offers) when given: a field is named by the words of
+    its name ("set audio speed to 1.5" -> AUDIO_SPEED), boolean fields can be switched on and
+    off ("disable clipboard" -> COPY_TO_CLIPBOARD), and values are coerced to the field's type.
+    `parse` returns None when a command names no field or more than one equally well, or the
+    value does not fit the type, so only those go to the LLM.
+    """
+
+    def __init__(
+        self, attributes: Collection[str] | None = None, settings_class: type[Settings] = Settings
+    ):
+        self.fields: list[_Field] = []
+        # Words of every setting, so a command naming one outside the vocabulary is not taken
+        # for a field that shares a word with it ("streaming transcription" is not TTS_STREAMING)
+        self.setting_words = {
+            word for name in settings_class.model_fields for word in name.lower().split("_")
+        } - FIELD_FILLER_WORDS
+        for name, field_info in settings_class.model_fields.items():
+            if name not in RUNTIME_SETTINGS or (attributes is not None and name not in attributes):
+                continue
+            base_types, optional = _base_types(field_info.annotation)
+            scalar = all(t in SCALAR_TYPES or get_origin(t) is Literal for t in base_types)
+            if len(base_types) != 1 or not scalar:
+                continue  # Lists and mixed types are left to the LLM
+            words = frozenset(name.lower().split("_")) - FIELD_FILLER_WORDS
+            self.fields.append(
+                _Field(name, words, base_types, optional, TypeAdapter(field_info.annotation))
+            )
+        self.fast_path = 0
+        self.fallbacks = 0
+
+    def parse(self, command: str) -> SettingsCommand | None:
+        text = self._normalize(command)
+        if VIEW_PATTERN.search(text) or text in ("settings", "config"):
+            return SettingsCommand(view=True)
+
+        # The value follows the last "to", but field names such as COPY_TO_CLIPBOARD contain one
+        # too, so "disable copy to clipboard" is retried as a field name without a value. The
+        # field is matched on normalised text; the value keeps its case and characters such as
+        # the slashes of a path or model ID
+        separators = list(VALUE_SEPARATOR.finditer(command))
+        resolved = None
+        if separators:
+            field_text = self._normalize(command[: separators[-1].start()])
+            value_text = command[separators[-1].end() :].strip().rstrip(".!?,;")
+            resolved = self._resolve(field_text, value_text)
+        return resolved or self._resolve(text, "")
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return re.sub(r"[^\w\s.'-]|\.(?!\d)", " ", text.lower()).strip()
+
+    def _resolve(self, field_text: str, value_text: str) -> SettingsCommand | None:
+        words = set(re.findall(r"[\w'-]+", field_text)) - COMMAND_FILLER_WORDS
+        field = self._match_field(words)
+        if field is None or (words & self.setting_words) - field.words:
+            return None
+        value = self._value(field, words, value_text.strip())
+        if value is _INVALID:
+            return None
+        return SettingsCommand(updates={field.name: value})
+
+    def _match_field(self, words: set[str]) -> _Field | None:
+        scored = sorted(
+            (
+                (len(field.words & words), len(field.words & words) / len(field.words), field)
+                for field in self.fields
+                if field.words & words
+            ),
+            key=lambda item: item[:2],
+            reverse=True,
+        )
+        if not scored:
+            return None
+        if len(scored) > 1 and scored[0][:2] == scored[1][:2]:
+            logger.debug(f"Settings command matches {scored[0][2].name} and {scored[1][2].name}")
+            return None
+        return scored[0][2]
+
+    def _value(self, field: _Field, words: set[str], value_text: str) -> Any:
+        if not value_text:
+            if not field.is_bool:
+                return _INVALID
+            enable, disable = bool(words & ENABLE_WORDS), bool(words & DISABLE_WORDS)
+            return enable if enable != disable else _INVALID
+        if value_text.lower() in NONE_WORDS:
+            return None if field.optional else _INVALID
+        if field.types == [str]:
+            value_text = value_text.strip("'\"")  # Free text keeps its case
+        else:
+            value_text = value_text.lower()
+        if field.is_bool and value_text in ENABLE_WORDS | DISABLE_WORDS:
+            return value_text in ENABLE_WORDS
+        try:
+            return field.adapter.validate_python(value_text)
+        except ValidationError:
+            return _INVALID
+
+    def record(self, fast_path: bool):
+        if fast_path:
+            self.fast_path += 1
+            metrics.inc("settings_commands_fast_path_total")
+        else:
+            self.fallbacks += 1
+            metrics.inc("settings_commands_llm_fallback_total")
+        logger.info(f"Settings commands resolved locally: {self.report()}")
+
+    @property
+    def fast_path_fraction(self) -> float:
+        total = self.fast_path + self.fallbacks
+        return self.fast_path / total if total else 0.0
+
+    def report(self) -> str:
+        total = self.fast_path + self.fallbacks
+        return f"{self.fast_path} of {total} ({self.fast_path_fraction:.0%})"
+
+
+_INVALID = object()
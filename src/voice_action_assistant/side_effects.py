@@ -0,0 +1,67 @@
+import contextvars
+import queue
+import time
+from threading import Lock, Thread
+from typing import Callable
+
+from loguru import logger
+
+from voice_action_assistant.config import config
+
+
+class SideEffectWorker:
+    """
+    Runs persistence side effects (audio encoding, transcript logs, archives) in the background.
+
+    Work items run in submission order on a single thread, so appends to the same log file keep
+    their order. The queue is bounded: when it is full `submit` blocks rather than dropping a
+    recording. Call `drain` before exiting so queued work is not lost.
+    """
+
+    def __init__(self, max_queue_size: int = config.SIDE_EFFECT_QUEUE_SIZE):
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: Thread | None = None
+        self._lock = Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="side-effects", daemon=True)
+                self._thread.start()
+
+    def submit(self, func: Callable, *args, **kwargs):
+        self._ensure_started()
+        if self.queue.full():
+            logger.warning("Side effect queue is full, waiting for background work to finish")
+        # Run in the submitter's context, so trace spans land in the interaction that saved
+        self.queue.put((contextvars.copy_context(), func, args, kwargs))
+
+    def _run(self):
+        while True:
+            context, func, args, kwargs = self.queue.get()
+            try:
+                context.run(func, *args, **kwargs)
+            except Exception as e:
+                logger.exception(f"Background side effect {func.__name__} failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Wait until every submitted side effect has finished. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.error(f"{self.queue.unfinished_tasks} side effects did not finish")
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+
+def append_to_file(file_name: str, text: str):
+    with open(file_name, "a") as f:
+        f.write(text)
+
+
+side_effects = SideEffectWorker()
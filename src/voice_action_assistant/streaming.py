@@ -0,0 +1,117 @@
+import threading
+import time
+
+import numpy as np
+from loguru import logger
+
+from voice_action_assistant.config import config
+from voice_action_assistant.recorder import AudioRecorder, EnergyVAD
+from voice_action_assistant.tracing import tracer
+from voice_action_assistant.transcriber import Transcriber
+
+
+class StreamingTranscriber:
+    """
+    Transcribes a recording in the background while it is still being recorded.
+
+    The recorder's audio is cut at pauses once a segment is at least `min_segment_seconds` long
+    (or forced at the quietest frame after `max_segment_seconds`) and each segment is decoded on
+    a worker thread. When the recording stops only the tail after the last cut is left to decode,
+    so the wait after the stop phrase no longer grows with the length of the dictation.
+    """
+
+    def __init__(
+        self,
+        recorder: AudioRecorder,
+        transcriber: Transcriber,
+        min_segment_seconds: float = config.STREAMING_MIN_SEGMENT_SECONDS,
+        max_segment_seconds: float = config.STREAMING_MAX_SEGMENT_SECONDS,
+        silence_seconds: float = config.STREAMING_SILENCE_SECONDS,
+        poll_seconds: float = 0.25,
+    ):
+        self.recorder = recorder
+        self.transcriber = transcriber
+        self.min_segment_samples = int(min_segment_seconds * recorder.fs)
+        self.max_segment_samples = int(max_segment_seconds * recorder.fs)
+        self.poll_seconds = poll_seconds
+        self.vad = EnergyVAD(
+            energy_threshold=config.VAD_ENERGY_THRESHOLD, zcr_threshold=config.VAD_ZCR_THRESHOLD
+        )
+        self.silence_frames = max(1, int(silence_seconds / self.vad.frame_seconds))
+
+        self.segments: list[str] = []
+        self.segment_start = 0
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self.segments = []
+        self.segment_start = 0
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="streaming-transcriber", daemon=True
+        )
+        self._thread.start()
+
+    @tracer.traced("streaming_finish")
+    def finish(self) -> str:
+        """Wait for in-flight segments, decode the remaining tail and return the transcript."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        buffer = self.recorder.signal_buffer
+        tail = buffer.read(self.segment_start, buffer.total_written)
+        if len(tail) > 0:
+            self._transcribe_segment(tail)
+        logger.debug(f"Stitched {len(self.segments)} streamed segments")
+        return " ".join(segment for segment in self.segments if segment)
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_seconds):
+            self._cut_ready_segment()
+
+    def _cut_ready_segment(self):
+        buffer = self.recorder.signal_buffer
+        end = buffer.total_written
+        if end - self.segment_start < self.min_segment_samples:
+            return
+
+        audio = buffer.read(self.segment_start, end)
+        cut = self._find_cut(audio)
+        if cut is None:
+            return
+
+        self._transcribe_segment(audio[:cut])
+        self.segment_start += cut
+
+    def _find_cut(self, audio: np.ndarray) -> int | None:
+        frame_length = int(self.vad.frame_seconds * self.recorder.fs)
+        speech_frames = self.vad.speech_frames(audio, self.recorder.fs)
+        first_frame = self.min_segment_samples // frame_length
+
+        silent_run = 0
+        for index in range(first_frame, len(speech_frames)):
+            silent_run = 0 if speech_frames[index] else silent_run + 1
+            if silent_run >= self.silence_frames:
+                # Cut in the middle of the pause so neither side loses a word edge
+                return (index - silent_run // 2) * frame_length
+
+        if len(audio) < self.max_segment_samples:
+            return None
+        n_frames = self.max_segment_samples // frame_length
+        # Settings rejects min >= max, but a transcriber built directly could still pass it
+        first_frame = min(first_frame, n_frames - 1)
+        frames = audio[: n_frames * frame_length].reshape(n_frames, frame_length)
+        rms = np.sqrt(np.mean(np.square(frames[first_frame:]), axis=1))
+        return (first_frame + int(np.argmin(rms))) * frame_length
+
+    def _transcribe_segment(self, audio: np.ndarray):
+        start_time = time.perf_counter()
+        transcript = self.transcriber.transcribe_dictation(audio)
+        self.segments.append(transcript.strip())
+        logger.debug(
+            f"Streamed segment of {len(audio) / self.recorder.fs:0.1f} seconds "
+            f"in {time.perf_counter() - start_time:0.2f} seconds"
+        )
@@ -0,0 +1,346 @@
+"""
+Speech to text backends behind a common interface.
+
+Every backend turns 16 kHz mono float32 audio into text. Backends register themselves by name in
+`STT_BACKENDS` and are picked with the STT_BACKEND setting, so `Transcriber` and the actions never
+depend on a specific engine. Optional engines are only imported when their backend is created.
+"""
+
+import io
+import time
+from pathlib import Path
+from threading import Thread
+from typing import TYPE_CHECKING
+
+import numpy as np
+from loguru import logger
+
+from voice_action_assistant.config import config
+from voice_action_assistant.llm_client import get_client
+from voice_action_assistant.profiling import startup_profile
+
+if TYPE_CHECKING:
+    from transformers import Pipeline
+
+SAMPLE_RATE = 16000
+
+
+class STTBackend:
+    name = ""
+    # Whether inference runs on this machine (remote backends skip the warm-up)
+    local = True
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        raise NotImplementedError
+
+
+STT_BACKENDS: dict[str, type[STTBackend]] = {}
+
+
+def register_backend(name: str):
+    def decorator(backend_class: type[STTBackend]) -> type[STTBackend]:
+        backend_class.name = name
+        STT_BACKENDS[name] = backend_class
+        return backend_class
+
+    return decorator
+
+
+def create_backend(name: str) -> STTBackend:
+    backend_class = STT_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown STT backend: {name}, available: {sorted(STT_BACKENDS)}")
+    logger.info(f"Using STT backend: {name}")
+    return backend_class()
+
+
+def model_cache_dir(model_id: str) -> Path:
+    return Path(config.STT_MODEL_CACHE_DIR) / model_id.replace("/", "--")
+
+
+def save_model_cache(model, processor, cache_dir: Path):
+    """Serialize the model and processor so the next launch skips the HF hub resolution."""
+    start_time = time.perf_counter()
+    partial_dir = cache_dir.with_name(cache_dir.name + ".partial")
+    model.save_pretrained(partial_dir, safe_serialization=True)
+    if processor is not None:
+        processor.save_pretrained(partial_dir)
+    partial_dir.rename(cache_dir)
+    logger.debug(f"Cached model in {cache_dir} in {time.perf_counter() - start_time:0.2f} seconds")
+
+
+def configure_torch_threads():
+    import torch
+
+    if config.TORCH_NUM_THREADS:
+        torch.set_num_threads(config.TORCH_NUM_THREADS)
+    if config.TORCH_NUM_INTEROP_THREADS:
+        # Only allowed once, before any inter-op parallel work has started
+        try:
+            torch.set_num_interop_threads(config.TORCH_NUM_INTEROP_THREADS)
+        except RuntimeError as e:
+            logger.warning(f"Could not set inter-op threads: {e}")
+
+
+def apply_acceleration(model, device: str):
+    """Apply the post-load STT_ACCELERATION modes (SDPA is chosen at load time)."""
+    import torch
+
+    if "int8" in config.STT_ACCELERATION:
+        if device == "cpu":
+            # Returns a quantized copy, the float32 weights stay intact for the model cache
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        else:
+            logger.warning(f"int8 dynamic quantization is CPU only, skipping it on {device}")
+    if "compile" in config.STT_ACCELERATION:
+        # The encoder always sees 30 second windows, so its static shapes compile well
+        model.model.encoder = torch.compile(model.model.encoder)
+    return model
+
+
+def build_asr_pipeline(model, processor, **kwargs) -> "Pipeline":
+    from transformers import pipeline
+
+    options = {"max_new_tokens": 128, "chunk_length_s": 15, "batch_size": 16, **kwargs}
+    return pipeline(
+        "automatic-speech-recognition",
+        model=model,
+        tokenizer=processor.tokenizer,
+        feature_extractor=processor.feature_extractor,
+        **options,
+    )
+
+
+def load_draft_model(model_id: str, torch_dtype, device: str):
+    """
+    Load the decoder of a distil-whisper checkpoint as the draft model for assisted decoding.
+
+    Only the decoder is loaded, so the draft has to share its encoder with the main model, as
+    distil-whisper checkpoints do with the Whisper model they were distilled from.
+    """
+    from transformers import AutoModelForCausalLM
+
+    # Not the directory init_local_model uses for the same checkpoint as a seq2seq model with
+    # its processor, so the two loads never write to or read each other's cache
+    cache_dir = model_cache_dir(f"{model_id}-draft")
+    cached = cache_dir.is_dir()
+    with startup_profile.phase("draft model load"):
+        draft_model = AutoModelForCausalLM.from_pretrained(
+            str(cache_dir) if cached else model_id,
+            torch_dtype=torch_dtype,
+            low_cpu_mem_usage=True,
+            use_safetensors=True,
+            device_map=device,
+            local_files_only=cached,
+        )
+    if not cached:
+        Thread(target=save_model_cache, args=(draft_model, None, cache_dir), daemon=True).start()
+    return draft_model
+
+
+def init_local_model(model_id: str | None = None, draft_model_id: str | None = None) -> "Pipeline":
+    """Load STT_MODEL_ID (or `model_id`), optionally with a draft model for assisted decoding."""
+    start_time = time.perf_counter()
+    with startup_profile.phase("torch import"):
+        import torch
+        from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor
+
+    device = "cuda:0" if torch.cuda.is_available() else "cpu"
+    torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+
+    model_id = model_id or config.STT_MODEL_ID
+    cache_dir = model_cache_dir(model_id)
+    cached = cache_dir.is_dir()
+    model_source = str(cache_dir) if cached else model_id
+
+    configure_torch_threads()
+    logger.info(f"Loading model: {model_source} on device: {device}")
+    logger.info(
+        f"STT acceleration: {config.STT_ACCELERATION or ['none']}, "
+        f"threads: {torch.get_num_threads()} intra-op / {torch.get_num_interop_threads()} inter-op"
+    )
+
+    with startup_profile.phase("model load"):
+        model = AutoModelForSpeechSeq2Seq.from_pretrained(
+            model_source,
+            torch_dtype=torch_dtype,
+            low_cpu_mem_usage=True,
+            use_safetensors=True,
+            device_map=device,
+            local_files_only=cached,
+            attn_implementation="sdpa" if "sdpa" in config.STT_ACCELERATION else None,
+        )
+    logger.debug(
+        f"Model loaded: {model_id} on device: {device} "
+        f"time: {time.perf_counter() - start_time:0.2f} seconds"
+    )
+
+    with startup_profile.phase("processor load"):
+        processor = AutoProcessor.from_pretrained(model_source, local_files_only=cached)
+
+    save_thread = None
+    if not cached:
+        save_thread = Thread(
+            target=save_model_cache, args=(model, processor, cache_dir), daemon=True
+        )
+        save_thread.start()
+
+    with startup_profile.phase("acceleration"):
+        if save_thread is not None and "compile" in config.STT_ACCELERATION:
+            # Compiling swaps the encoder for a wrapper whose weights are saved under
+            # `_orig_mod.` names, so the cache has to be written before that
+            save_thread.join()
+        model = apply_acceleration(model, device)
+
+    pipeline_options = {}
+    if draft_model_id:
+        draft_model = load_draft_model(draft_model_id, torch_dtype, device)
+        # Assisted generation verifies the draft tokens one sequence at a time
+        pipeline_options = {"batch_size": 1, "generate_kwargs": {"assistant_model": draft_model}}
+        logger.info(f"Assisted decoding: {draft_model_id} drafts tokens for {model_id}")
+
+    with startup_profile.phase("pipeline build"):
+        pipe = build_asr_pipeline(model, processor, torch_dtype=torch_dtype, **pipeline_options)
+
+    logger.info(f"Loaded speech to text model in {time.perf_counter() - start_time:0.2f} seconds")
+    return pipe
+
+
+@register_backend("transformers")
+class TransformersBackend(STTBackend):
+    """The Hugging Face transformers pipeline in eager PyTorch."""
+
+    def __init__(self):
+        self.model = init_local_model()
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        transcript = self.model(inputs=audio)
+        assert isinstance(transcript, dict), "Failed to transcribe audio"
+        return transcript.get("text")
+
+
+@register_backend("assisted")
+class AssistedBackend(TransformersBackend):
+    """
+    Assisted (speculative) decoding: a small draft model proposes tokens for a large one.
+
+    The large STT_ASSISTED_MAIN_MODEL_ID checks all drafted tokens in a single forward pass, so
+    the output matches the large model alone while most tokens cost about as much as the draft
+    model. Meant for dictations, where accuracy matters more than for wake phrases.
+    """
+
+    def __init__(self):
+        self.model = init_local_model(
+            config.STT_ASSISTED_MAIN_MODEL_ID, config.STT_ASSISTED_DRAFT_MODEL_ID
+        )
+
+
+@register_backend("onnx")
+class ONNXBackend(STTBackend):
+    """
+    ONNX Runtime encoder/decoder exported with optimum.
+
+    The first launch exports STT_MODEL_ID to ONNX and caches it next to the transformers model.
+    Requires the `onnx` extra (`optimum[onnxruntime]`).
+    """
+
+    def __init__(self):
+        try:
+            from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+            from transformers import AutoProcessor
+        except ImportError as e:
+            raise ImportError("The onnx STT backend requires `optimum[onnxruntime]`") from e
+
+        cache_dir = model_cache_dir(f"{config.STT_MODEL_ID}-onnx")
+        with startup_profile.phase("model load"):
+            if cache_dir.is_dir():
+                model = ORTModelForSpeechSeq2Seq.from_pretrained(cache_dir)
+                processor = AutoProcessor.from_pretrained(cache_dir)
+            else:
+                logger.info(f"Exporting {config.STT_MODEL_ID} to ONNX, this only happens once")
+                model = ORTModelForSpeechSeq2Seq.from_pretrained(config.STT_MODEL_ID, export=True)
+                processor = AutoProcessor.from_pretrained(config.STT_MODEL_ID)
+                model.save_pretrained(cache_dir)
+                processor.save_pretrained(cache_dir)
+        with startup_profile.phase("pipeline build"):
+            self.model = build_asr_pipeline(model, processor)
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        return self.model(inputs=audio)["text"]
+
+
+@register_backend("ctranslate2")
+class CTranslate2Backend(STTBackend):
+    """
+    CTranslate2 int8 inference through faster-whisper.
+
+    Uses the converted model named by STT_CTRANSLATE2_MODEL. Requires the `ctranslate2` extra.
+    """
+
+    def __init__(self):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ImportError("The ctranslate2 STT backend requires `faster-whisper`") from e
+
+        with startup_profile.phase("model load"):
+            self.model = WhisperModel(
+                config.STT_CTRANSLATE2_MODEL,
+                device="auto",
+                compute_type=config.STT_CTRANSLATE2_COMPUTE_TYPE,
+                cpu_threads=config.TORCH_NUM_THREADS or 0,
+                download_root=config.STT_MODEL_CACHE_DIR,
+            )
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        segments, _ = self.model.transcribe(
+            audio.astype(np.float32), language="en", beam_size=1, vad_filter=False
+        )
+        return " ".join(segment.text.strip() for segment in segments)
+
+
+@register_backend("openai")
+class OpenAIBackend(STTBackend):
+    """The OpenAI `whisper-1` transcription API."""
+
+    local = False
+
+    def __init__(self):
+        self.client = get_client()
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        from scipy.io.wavfile import write
+
+        wav_file = io.BytesIO()
+        write(wav_file, SAMPLE_RATE, audio)
+        wav_file.name = "audio.wav"  # The API infers the format from the name
+        wav_file.seek(0)
+        transcript = self.client.audio.transcriptions.create(model="whisper-1", file=wav_file)
+        return transcript.text
+
+
+@register_backend("fake")
+class FakeBackend(STTBackend):
+    """
+    Deterministic backend for tests and offline benchmarks.
+
+    Always returns STT_FAKE_TRANSCRIPT and sleeps for STT_FAKE_REAL_TIME_FACTOR seconds per second
+    of audio, so pipelines can be exercised without a model.
+    """
+
+    def __init__(
+        self,
+        transcript: str | None = None,
+        real_time_factor: float | None = None,
+    ):
+        self.transcript = config.STT_FAKE_TRANSCRIPT if transcript is None else transcript
+        self.real_time_factor = (
+            config.STT_FAKE_REAL_TIME_FACTOR if real_time_factor is None else real_time_factor
+        )
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        if self.real_time_factor:
+            time.sleep(len(audio) / SAMPLE_RATE * self.real_time_factor)
+        return self.transcript
@@ -0,0 +1,253 @@
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable
+
+import numpy as np
+from loguru import logger
+
+from voice_action_assistant.config import config
+from voice_action_assistant.side_effects import side_effects
+
+# Converts perf_counter() readings to wall-clock time, so traces from several runs line up
+_WALL_CLOCK_OFFSET = time.time() - time.perf_counter()
+
+
+class Trace:
+    """The spans of one dispatched utterance, sharing a correlation ID."""
+
+    def __init__(self, name: str, args: dict):
+        self.trace_id = uuid.uuid4().hex[:8]
+        self.name = name
+        self.args = args
+        self.events: list[dict] = []
+        self.keep = True  # Set to False to drop an interaction that turned out to be noise
+        self._next_span_id = 1  # 0 is the root span
+        self._lock = threading.Lock()
+
+    def new_span_id(self) -> int:
+        with self._lock:
+            span_id = self._next_span_id
+            self._next_span_id += 1
+            return span_id
+
+    def add(
+        self,
+        name: str,
+        started_at: float,
+        duration: float,
+        span_id: int,
+        parent_id: int | None,
+        args: dict,
+    ):
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": round((started_at + _WALL_CLOCK_OFFSET) * 1e6),
+            "dur": round(duration * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_native_id(),
+            "args": {
+                "trace_id": self.trace_id,
+                "span_id": span_id,
+                "parent_id": parent_id,
+                **args,
+            },
+        }
+        with self._lock:
+            self.events.append(event)
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[int | None] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    Records per-utterance spans and writes them as Chrome trace events (open in Perfetto).
+
+    `interaction` starts a trace for one dispatched utterance. `span` and `traced` time work
+    inside it, on any thread that inherits the context: the side effect worker runs its items in
+    the submitter's context, so background saves land in the right trace. Outside an
+    interaction, or with tracing disabled, spans cost one context variable lookup.
+
+    The last TRACE_MAX_INTERACTIONS traces are kept in TRACE_FILE, rewritten after each one.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = config.TRACING_ENABLED,
+        trace_file: str = config.TRACE_FILE,
+        max_interactions: int = config.TRACE_MAX_INTERACTIONS,
+    ):
+        self.enabled = enabled
+        self.trace_file = trace_file
+        self.traces: deque[list[dict]] = deque(maxlen=max_interactions)
+        self.thread_names: dict[int, str] = {}
+        self._loaded = False
+
+    @contextmanager
+    def interaction(self, name: str, started_at: float | None = None, **args):
+        """Trace everything in the block as one interaction; yields the Trace (or None)."""
+        if not self.enabled:
+            yield None
+            return
+        started_at = time.perf_counter() if started_at is None else started_at
+        trace = Trace(name, args)
+        self._name_thread()
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(0)
+        try:
+            with logger.contextualize(trace_id=trace.trace_id):
+                yield trace
+        finally:
+            duration = time.perf_counter() - started_at
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            trace.add(name, started_at, duration, 0, None, {"root": True, **trace.args})
+            if trace.keep:
+                logger.debug(f"Trace {trace.trace_id}: {name} took {duration:0.2f} seconds")
+                # Queued behind the saves this interaction submitted, so their spans are included
+                side_effects.submit(self._finish, trace)
+
+    @contextmanager
+    def span(self, name: str, **args):
+        trace = _current_trace.get()
+        if trace is None:
+            yield
+            return
+        self._name_thread()
+        parent_id = _current_span.get()
+        span_id = trace.new_span_id()
+        token = _current_span.set(span_id)
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            _current_span.reset(token)
+            duration = time.perf_counter() - started_at
+            trace.add(name, started_at, duration, span_id, parent_id, args)
+
+    def record(self, name: str, started_at: float, finished_at: float, **args):
+        """Add a span for work that was timed before the interaction started."""
+        trace = _current_trace.get()
+        if trace is not None:
+            duration = finished_at - started_at
+            trace.add(name, started_at, duration, trace.new_span_id(), _current_span.get(), args)
+
+    def _name_thread(self):
+        self.thread_names.setdefault(threading.get_native_id(), threading.current_thread().name)
+
+    def traced(self, name: str) -> Callable:
+        """Decorator version of `span`."""
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _finish(self, trace: Trace):
+        if not self._loaded:
+            # Keep the traces of previous runs
+            self._loaded = True
+            for events in group_traces(load_trace_events(self.trace_file)):
+                self.traces.append(events)
+        self.traces.append(list(trace.events))
+        self.write()
+
+    def write(self):
+        pid = os.getpid()
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in self.thread_names.items()
+        ]
+        events = [event for events in self.traces for event in events]
+        partial_file = f"{self.trace_file}.partial"
+        with open(partial_file, "w") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+        os.replace(partial_file, self.trace_file)
+
+
+def load_trace_events(trace_file: str) -> list[dict]:
+    if not os.path.exists(trace_file):
+        return []
+    try:
+        with open(trace_file) as f:
+            return json.load(f).get("traceEvents", [])
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Could not read traces from {trace_file}: {e}")
+        return []
+
+
+def group_traces(events: list[dict]) -> list[list[dict]]:
+    """Split span events by trace ID, oldest interaction first."""
+    traces: dict[str, list[dict]] = {}
+    for event in events:
+        if event.get("ph") == "X":
+            traces.setdefault(event["args"]["trace_id"], []).append(event)
+    return sorted(traces.values(), key=lambda spans: min(span["ts"] for span in spans))
+
+
+def critical_path(spans: list[dict]) -> dict[str, float] | None:
+    """
+    Milliseconds spent in each step of one interaction, in the order they happened.
+
+    Steps are the innermost spans on the dispatching thread, so work that overlaps it
+    (background saves) is left out. Time not covered by any step, such as waiting in the
+    dispatch queue, is reported as "other".
+    """
+    root = next((span for span in spans if span["args"].get("root")), None)
+    if root is None:
+        return None
+    on_path = [span for span in spans if span["tid"] == root["tid"] and span is not root]
+    parent_ids = {span["args"]["parent_id"] for span in on_path}
+    steps = sorted(
+        (span for span in on_path if span["args"]["span_id"] not in parent_ids),
+        key=lambda span: span["ts"],
+    )
+    breakdown: dict[str, float] = {}
+    for step in steps:
+        breakdown[step["name"]] = breakdown.get(step["name"], 0.0) + step["dur"] / 1000
+    breakdown["other"] = max(root["dur"] / 1000 - sum(breakdown.values()), 0.0)
+    breakdown["total"] = root["dur"] / 1000
+    return breakdown
+
+
+def summarize(events: list[dict], last: int = 20) -> str:
+    traces = group_traces(events)[-last:]
+    breakdowns = [breakdown for spans in traces if (breakdown := critical_path(spans))]
+    if not breakdowns:
+        return "No traces recorded yet, set TRACING_ENABLED: true and talk to the assistant."
+
+    step_names: list[str] = []
+    for breakdown in breakdowns:
+        step_names.extend(name for name in breakdown if name not in step_names)
+    step_names.sort(key=lambda name: name in ("other", "total"))
+
+    mean_total = np.mean([breakdown["total"] for breakdown in breakdowns])
+    lines = [
+        f"Critical path over the last {len(breakdowns)} interactions (ms):",
+        f"  {'step':<28} {'count':>5} {'mean':>9} {'p95':>9} {'share':>6}",
+    ]
+    for name in step_names:
+        values = [breakdown[name] for breakdown in breakdowns if name in breakdown]
+        mean = sum(values) / len(breakdowns)
+        lines.append(
+            f"  {name:<28} {len(values):>5} {mean:>9.1f} "
+            f"{np.percentile(values, 95):>9.1f} {mean / mean_total:>6.0%}"
+        )
+    return "\n".join(lines)
+
+
+tracer = Tracer()
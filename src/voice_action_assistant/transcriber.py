@@ -1,99 +1,41 @@
-import time
 from datetime import datetime
+from threading import Event, Lock, Thread
 from typing import Union
 
 import numpy as np
-import torch
-from dotenv import load_dotenv
 from loguru import logger
-from pygame import mixer
-from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, Pipeline, pipeline
 
 from voice_action_assistant.config import config
+from voice_action_assistant.metrics import metrics
+from voice_action_assistant.profiling import startup_profile
+from voice_action_assistant.stt_backends import create_backend
+from voice_action_assistant.tracing import tracer
 from voice_action_assistant.utils import (
-    init_client,
+    example_waveform,
+    load_cached_audio_file,
     load_numpy_from_audio_file,
     remove_trailing_phrase,
-    timer_decorator,
 )
 
-mixer.init()
-
-load_dotenv()
-
-
-def init_local_model() -> Pipeline:
-    start_time = time.time()
-    device = "cuda:0" if torch.cuda.is_available() else "cpu"
-    torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
-
-    # model_id = "distil-whisper/distil-large-v2"
-    # model_id = "distil-whisper/distil-medium.en"
-    model_id = "distil-whisper/distil-small.en"
-
-    logger.info(f"Loading model: {model_id} on device: {device}")
-
-    model = AutoModelForSpeechSeq2Seq.from_pretrained(
-        model_id,
-        torch_dtype=torch_dtype,
-        low_cpu_mem_usage=True,
-        use_safetensors=True,
-        device_map=device,
-    )
-    logger.debug(f"Fount model: {model_id}, time: {time.time() - start_time:0.2f} seconds")
-
-    # model.to(device)
-    logger.debug(
-        f"Model loaded: {model_id} on device: {device} time: {time.time() - start_time:0.2f} seconds"
-    )
-
-    processor = AutoProcessor.from_pretrained(model_id)
-
-    pipe = pipeline(
-        "automatic-speech-recognition",
-        model=model,
-        tokenizer=processor.tokenizer,
-        feature_extractor=processor.feature_extractor,
-        max_new_tokens=128,
-        chunk_length_s=15,
-        batch_size=16,
-        torch_dtype=torch_dtype,
-    )
-
-    # # Todo: figure out why so slow on first run
-    # logger.debug(f"Testing model on example waveform: {example_waveform()}")
-    # test_transcript = pipe(example_waveform())
-    # assert isinstance(
-    #     test_transcript["text"], str
-    # ), "Model failed to transcribe test waveform"
-
-    logger.info(f"Loaded speech to text model in {time.time() - start_time:0.2f} seconds")
-    return pipe
-
 
 class STT:
-    def __init__(self, local=True):
-        self.local = local
-        if self.local:
-            self.model = init_local_model()
-        else:
-            self.client = init_client()
+    def __init__(self, backend_name: str | None = None):
+        self.backend = create_backend(backend_name or config.STT_BACKEND)
+
+    @property
+    def local(self) -> bool:
+        return self.backend.local
 
     def transcribe(
         self,
         audio_file: Union[str, np.ndarray],
     ):
-        if self.local and isinstance(audio_file, np.ndarray):
-            transcript = self.model(inputs=audio_file)
-            assert isinstance(transcript, dict), "Failed to transcribe audio"
-
-            transcript_text = transcript.get("text")
-        elif isinstance(audio_file, str):
-            with open(audio_file, "rb") as f:
-                transcript = self.client.audio.transcriptions.create(model="whisper-1", file=f)
-                transcript_text = transcript.text
-        else:
+        if isinstance(audio_file, str):
+            audio_file = load_numpy_from_audio_file(audio_file)
+        elif not isinstance(audio_file, np.ndarray):
             raise ValueError("audio_file must be a file path or numpy array")
+
+        transcript_text = self.backend.transcribe(audio_file)
         assert isinstance(transcript_text, str), "Failed to transcribe audio"
 
         return transcript_text.strip()
@@ -101,17 +43,88 @@ class STT:
 
 class Transcriber:
     def __init__(self):
-        self.stt = STT(local=config.LOCAL)
+        # LOCAL: false keeps its original meaning of transcribing with the OpenAI API
+        self.stt = STT(config.STT_BACKEND if config.LOCAL else "openai")
+        # The wake detector and the streaming transcriber share one model
+        self.lock = Lock()
+        # Reused for prefix + audio, only touched while holding the lock
+        self._concat_buffer = np.empty(0, dtype=np.float32)
+
+        # Dictations can use a slower, more accurate backend than the wake phrase detector
+        self.dictation_stt: STT | None = None
+        self.dictation_lock = Lock()
+        self._dictation_ready = Event()
+        dictation_backend = config.STT_DICTATION_BACKEND if config.LOCAL else None
+        if not dictation_backend and config.STREAMING_TRANSCRIPTION:
+            # Streamed segments are decoded while the wake detector listens for the stop phrase;
+            # on the shared model a long segment would hold it off, so they get their own copy
+            dictation_backend = self.stt.backend.name
+        if dictation_backend:
+            Thread(
+                target=self._load_dictation_backend,
+                args=(dictation_backend,),
+                name="stt-dictation-load",
+                daemon=True,
+            ).start()
+        else:
+            self._dictation_ready.set()
 
-    @timer_decorator
+        if self.stt.local and config.STT_WARMUP:
+            # Runs while the startup sound plays; the first real transcription waits on the lock
+            Thread(target=self.warm_up, name="stt-warm-up", daemon=True).start()
+        else:
+            startup_profile.log_report()
+
+    def warm_up(self):
+        """Run a dummy inference so the first wake window does not pay for lazy initialisation."""
+        with self.lock, startup_profile.phase("first inference"):
+            test_transcript = self.stt.transcribe(example_waveform())
+        assert isinstance(test_transcript, str), "Model failed to transcribe test waveform"
+        logger.info("Speech to text model warmed up.")
+        startup_profile.log_report()
+
+    def _load_dictation_backend(self, backend_name: str):
+        try:
+            self.dictation_stt = STT(backend_name)
+        except Exception as e:
+            logger.exception(f"Could not load the dictation backend, using the default: {e}")
+        finally:
+            self._dictation_ready.set()
+
+    def _with_prefix(self, pre_audio: np.ndarray, audio: np.ndarray) -> np.ndarray:
+        n_samples = len(pre_audio) + len(audio)
+        if len(self._concat_buffer) < n_samples:
+            self._concat_buffer = np.empty(n_samples, dtype=np.float32)
+        combined = self._concat_buffer[:n_samples]
+        combined[: len(pre_audio)] = pre_audio
+        combined[len(pre_audio) :] = audio
+        return combined
+
+    @metrics.timed("transcribe_audio_seconds")
+    @tracer.traced("transcribe_audio")
     def transcribe_audio(self, audio: np.ndarray, pre_audio_file: str = ""):
-        if pre_audio_file:
-            pre_audio = load_numpy_from_audio_file(pre_audio_file)
-            audio = np.concatenate((pre_audio, audio))
+        pre_audio = load_cached_audio_file(pre_audio_file) if pre_audio_file else None
+
+        with self.lock:
+            if pre_audio is not None:
+                audio = self._with_prefix(pre_audio, audio)
+            transcript = self.stt.transcribe(
+                audio_file=audio,
+            )
+        logger.debug(f"Raw Transcript: {transcript}")
+        return transcript
 
-        transcript = self.stt.transcribe(
-            audio_file=audio,
-        )
+    @metrics.timed("transcribe_dictation_seconds")
+    @tracer.traced("transcribe_dictation")
+    def transcribe_dictation(self, audio: np.ndarray) -> str:
+        """Transcribe a recording with STT_DICTATION_BACKEND, or the default model if unset."""
+        if not self._dictation_ready.is_set():
+            logger.info("Waiting for the dictation model to finish loading...")
+            self._dictation_ready.wait()
+        if self.dictation_stt is None:
+            return self.transcribe_audio(audio)
+        with self.dictation_lock:
+            transcript = self.dictation_stt.transcribe(audio_file=audio)
         logger.debug(f"Raw Transcript: {transcript}")
         return transcript
 
@@ -120,6 +133,7 @@ class Transcriber:
         logger.debug(f"Clean Transcript: {transcript}")
         return clean_transcript
 
+    @tracer.traced("save_transcript")
     def save_transcript(self, transcript):
         with open("output.txt", "a") as f:
             f.write(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}:\n{transcript}\n")
@@ -0,0 +1,202 @@
+import queue
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Thread
+from typing import Protocol
+
+import numpy as np
+from loguru import logger
+
+from voice_action_assistant.audio_dsp import time_stretch
+from voice_action_assistant.config import config
+from voice_action_assistant.llm_client import get_client
+from voice_action_assistant.metrics import metrics
+from voice_action_assistant.output_sink import SinkTarget
+from voice_action_assistant.tracing import tracer
+
+SPEECH_SAMPLE_RATE = 24000  # OpenAI's raw pcm output is 16 bit mono at 24 kHz
+
+# The end of a sentence (with any closing quote or bracket) followed by whitespace, or a newline
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n\s*")
+CODE_FENCE = "```"
+
+
+class SentenceSplitter:
+    """
+    Cuts streamed LLM text into sentences that are worth a speech request.
+
+    Sentences shorter than `min_chars` are joined with the next one, so "Sure." does not cost a
+    request of its own. Fenced code blocks are left out; they are copied to the clipboard and
+    reading them aloud helps nobody.
+    """
+
+    def __init__(self, min_chars: int = config.TTS_MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self.buffer = ""
+        self.in_code_block = False
+
+    def feed(self, text: str) -> list[str]:
+        self.buffer += text
+        sentences = []
+        while True:
+            if self.in_code_block:
+                end = self.buffer.find(CODE_FENCE)
+                if end < 0:
+                    # Keep what could be the start of the closing fence
+                    self.buffer = self.buffer[-(len(CODE_FENCE) - 1) :]
+                    return sentences
+                self.buffer = self.buffer[end + len(CODE_FENCE) :]
+                self.in_code_block = False
+                continue
+
+            fence = self.buffer.find(CODE_FENCE)
+            if fence < 0:
+                complete, self.buffer = self._split(self.buffer, final=False)
+                return sentences + complete
+            sentences += self._split(self.buffer[:fence], final=True)[0]
+            self.buffer = self.buffer[fence + len(CODE_FENCE) :]
+            self.in_code_block = True
+
+    def finish(self) -> list[str]:
+        """Return whatever is left once the stream has ended."""
+        text, self.buffer = self.buffer, ""
+        if self.in_code_block:
+            return []
+        return self._split(text, final=True)[0]
+
+    def _split(self, text: str, final: bool) -> tuple[list[str], str]:
+        sentences, start = [], 0
+        for match in SENTENCE_END.finditer(text):
+            sentence = self._clean(text[start : match.end()])
+            if len(sentence) >= self.min_chars:
+                sentences.append(sentence)
+                start = match.end()
+        rest = text[start:]
+        if final:
+            if self._clean(rest):
+                sentences.append(self._clean(rest))
+            rest = ""
+        return sentences, rest
+
+    @staticmethod
+    def _clean(text: str) -> str:
+        # Markdown emphasis, headings and inline code would be read out as symbols
+        return re.sub(r"[*#`_]+", "", text).strip()
+
+
+class SpeechPlayer(Protocol):
+    def enqueue(self, audio: np.ndarray, sample_rate: int):
+        """Play `audio` right after whatever is already queued, blocking while the queue is full."""
+
+    def wait(self):
+        """Block until everything queued has played."""
+
+
+class MixerPlayer:
+    """Plays segments back to back on the reserved speech channel of the pygame mixer."""
+
+    def __init__(self):
+        from pygame import mixer
+
+        from voice_action_assistant.audio_cues import SPEECH_CHANNEL, audio_cues
+
+        audio_cues.load()  # Initialises the mixer and reserves the speech channel
+        self.channel = mixer.Channel(SPEECH_CHANNEL)
+
+    def enqueue(self, audio: np.ndarray, sample_rate: int):
+        from voice_action_assistant.audio_cues import make_sound
+
+        sound = make_sound(audio, sample_rate)
+        # A channel holds one playing and one queued sound; the queued one starts without a gap
+        while self.channel.get_queue() is not None:
+            time.sleep(0.01)
+        self.channel.queue(sound)
+
+    def wait(self):
+        while self.channel.get_busy() or self.channel.get_queue() is not None:
+            time.sleep(0.01)
+
+
+def synthesize(text: str, speed: float | None = None) -> np.ndarray:
+    """
+    Request speech for `text` as raw pcm and time-stretch it to `speed`.
+
+    Nothing is encoded, decoded or written to disk: the samples go from the response body
+    through `time_stretch` straight into a mixer Sound. `speed` defaults to AUDIO_SPEED as it
+    is when called, so a change from the settings action applies to the next sentence.
+    """
+    response = get_client().audio.speech.create(
+        model=config.TTS_MODEL,
+        voice=config.TTS_VOICE,
+        input=text,
+        response_format="pcm",
+    )
+    audio = np.frombuffer(response.content, dtype="<i2")
+    return time_stretch(audio, SPEECH_SAMPLE_RATE, speed or config.AUDIO_SPEED)
+
+
+class StreamingSpeaker(SinkTarget):
+    """
+    Speaks an LLM response while it is still streaming.
+
+    Each sentence from `SentenceSplitter` is sent to the speech endpoint as soon as it is
+    complete, up to `max_concurrent_requests` at a time, as raw pcm so nothing is encoded or
+    written to disk. A playback thread takes the results in order and queues them on the
+    player, so speech starts after the first sentence instead of after the whole response.
+    Closing the target waits until everything has been spoken.
+    """
+
+    def __init__(
+        self,
+        requested_at: float | None = None,
+        player: SpeechPlayer | None = None,
+        max_concurrent_requests: int = config.TTS_MAX_CONCURRENT_REQUESTS,
+        speed: float | None = None,
+    ):
+        # Time to first audio is measured from the LLM request when given
+        self.started_at = time.perf_counter() if requested_at is None else requested_at
+        self.first_audio_at: float | None = None
+        self.speed = speed
+        self.player = player or MixerPlayer()
+        self.splitter = SentenceSplitter()
+        self.executor = ThreadPoolExecutor(max_concurrent_requests, thread_name_prefix="tts")
+        self.segments: queue.Queue[Future | None] = queue.Queue()
+        self._thread = Thread(target=self._play_segments, name="tts-playback", daemon=True)
+        self._thread.start()
+
+    @property
+    def time_to_first_audio(self) -> float | None:
+        if self.first_audio_at is None:
+            return None
+        return self.first_audio_at - self.started_at
+
+    def write(self, text: str):
+        for sentence in self.splitter.feed(text):
+            self._submit(sentence)
+
+    def _submit(self, sentence: str):
+        self.segments.put(self.executor.submit(synthesize, sentence, self.speed))
+
+    def _play_segments(self):
+        while (future := self.segments.get()) is not None:
+            try:
+                audio = future.result()
+            except Exception as e:
+                logger.exception(f"Error with text-to-speech engine: {e}")
+                continue
+            self.player.enqueue(audio, SPEECH_SAMPLE_RATE)
+            if self.first_audio_at is None:
+                self.first_audio_at = time.perf_counter()
+                logger.info(f"Time to first audio: {self.time_to_first_audio:0.2f} seconds")
+                metrics.observe("tts_time_to_first_audio_seconds", self.time_to_first_audio)
+        self.player.wait()
+
+    def close(self, full_text: str):
+        for sentence in self.splitter.finish():
+            self._submit(sentence)
+        self.segments.put(None)
+        with tracer.span("tts_playback"):
+            self._thread.join()
+        self.executor.shutdown()
+        logger.info("Response spoken.")
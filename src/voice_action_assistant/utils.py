@@ -5,22 +5,18 @@ import sys
 import time
 from collections import deque
 from enum import Enum
-from pathlib import Path
+from functools import lru_cache
 from textwrap import dedent
 from threading import Lock
 
 import numpy as np
-import pyautogui
-import pygame
 import pyperclip
-import torch
 import yaml
 from loguru import logger
-from openai import OpenAI
-from pydub import AudioSegment
-from pygame import mixer
 
 from voice_action_assistant.config import config
+from voice_action_assistant.llm_client import get_client, stream_text
+from voice_action_assistant.tracing import tracer
 
 
 def load_config_yml(file_path: str):
@@ -43,22 +39,21 @@ def create_regex_pattern(phrase):
     return regex_pattern
 
 
-def transcript_contains_phrase(transcript, action_phrase):
-    # Generate the regex pattern from the stop phrase
-    pattern = create_regex_pattern(action_phrase)
+@lru_cache(maxsize=1024)
+def compile_phrase_pattern(phrase) -> re.Pattern:
+    return re.compile(create_regex_pattern(phrase), flags=re.IGNORECASE)
+
 
-    # Use regex to search for the stop phrase
-    match = re.search(pattern, transcript, flags=re.IGNORECASE)
+def transcript_contains_phrase(transcript, action_phrase):
+    # Use the cached regex to search for the stop phrase
+    match = compile_phrase_pattern(action_phrase).search(transcript)
     logger.debug(f"{transcript} contains {action_phrase}: {match is not None}")
     return match is not None
 
 
 def remove_trailing_phrase(transcript, phrase):
-    # Generate the regex pattern from the stop phrase
-    pattern = create_regex_pattern(phrase)
-
-    # Use regex to substitute the stop phrase with an empty string
-    cleaned_transcript = re.sub(pattern, "", transcript, flags=re.IGNORECASE).strip()
+    # Use the cached regex to substitute the stop phrase with an empty string
+    cleaned_transcript = compile_phrase_pattern(phrase).sub("", transcript).strip()
 
     return cleaned_transcript
 
@@ -74,6 +69,7 @@ def load_numpy_from_audio_file(audio_file: str, target_rate=16000):
     Returns:
     numpy.ndarray: A normalized and resampled NumPy array of the audio.
     """
+    from pydub import AudioSegment
 
     audio_segment = AudioSegment.from_file(audio_file)
 
@@ -94,32 +90,31 @@ def load_numpy_from_audio_file(audio_file: str, target_rate=16000):
     return samples
 
 
-def play_sound(sound_file):
-    pygame.mixer.init()
-    pygame.mixer.music.load(sound_file)
-    pygame.mixer.music.play()
-    while pygame.mixer.music.get_busy():  # Wait for audio to finish playing
-        pygame.time.Clock().tick(10)
+@lru_cache(maxsize=8)
+def _load_audio_file_version(audio_file: str, mtime_ns: int, size: int, target_rate: int):
+    samples = load_numpy_from_audio_file(audio_file, target_rate)
+    # Shared between callers, so nobody may modify it in place
+    samples.flags.writeable = False
+    return samples
 
 
-def timer_decorator(func):
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        elapsed_time = end_time - start_time
-        logger.debug(f"The method {func.__name__} took {elapsed_time} seconds to complete.")
-        return result
+def load_cached_audio_file(audio_file: str, target_rate=16000) -> np.ndarray:
+    """
+    Like `load_numpy_from_audio_file`, but decodes each version of a file only once.
 
-    return wrapper
+    The cache key includes the file's mtime and size, so editing or replacing the file is
+    picked up on the next call. The returned array is read-only.
+    """
+    stat = os.stat(audio_file)
+    return _load_audio_file_version(audio_file, stat.st_mtime_ns, stat.st_size, target_rate)
 
 
-def speed_up_audio(filename: str, speed=2):
-    if speed == 1:
-        return
-    sound: AudioSegment = AudioSegment.from_file(filename)
-    sound_with_altered_speed = sound.speedup(playback_speed=speed)
-    sound_with_altered_speed.export(filename, format="mp3")
+@tracer.traced("play_sound")
+def play_sound(sound_file, wait: bool = False):
+    # pygame is only imported once a sound is played
+    from voice_action_assistant.audio_cues import audio_cues
+
+    audio_cues.play(sound_file, wait=wait)
 
 
 def example_waveform():
@@ -129,10 +124,10 @@ def example_waveform():
     frequency = 440.0  # Frequency of the sine wave in Hz (A4 note)
 
     # Generate time values
-    t = torch.linspace(0, duration, int(sample_rate * duration))
+    t = np.linspace(0, duration, int(sample_rate * duration), dtype=np.float32)
 
     # Generate the sine wave
-    waveform = torch.sin(2 * math.pi * frequency * t).numpy()
+    waveform = np.sin(2 * math.pi * frequency * t)
     return waveform
 
 
@@ -142,13 +137,6 @@ def load_text_file(file_path):
     return text
 
 
-def init_client():
-    openai_client = OpenAI(
-        api_key=os.getenv("OPENAI_API_KEY"),
-    )
-    return openai_client
-
-
 def llm_post_process_transcript(transcript: str):
     system_prompt = dedent(
         f"""\
@@ -159,7 +147,8 @@ def llm_post_process_transcript(transcript: str):
         """
     )  # config.TRANSCRIPTION_PREPROMPT
 
-    openai_client = init_client()
+    openai_client = get_client()
+    requested_at = time.perf_counter()
     completion = openai_client.chat.completions.create(
         model=config.MODEL_ID,
         messages=[
@@ -171,20 +160,17 @@ def llm_post_process_transcript(transcript: str):
         stream=True,
     )
 
-    response_text = ""
+    # Imported here because output_sink depends on this module
+    from voice_action_assistant.output_sink import LogTarget, StreamingOutputSink
 
-    with open("output.txt", "a") as f:
-        f.write("\nLLM output:\n")
-    for chunk in completion:
-        str_delta = chunk.choices[0].delta.content
-        if str_delta:
-            response_text += str_delta
-            with open("output.txt", "a") as f:
-                f.write(f"{response_text}")
+    with StreamingOutputSink([LogTarget("output.txt", header="\nLLM output:\n")]) as sink:
+        for str_delta in stream_text(completion, requested_at):
+            sink.write(str_delta)
 
-    return response_text
+    return sink.text
 
 
+@tracer.traced("paste_at_cursor")
 def paste_at_cursor():
     """
     Paste the text at the cursor position.
@@ -196,45 +182,36 @@ def paste_at_cursor():
     This would still require system permissions.
     """
     if config.PASTE_AT_CURSOR:
+        import pyautogui
+
         pyautogui.keyDown("command")
         pyautogui.press("v")
         pyautogui.keyUp("command")
 
 
+@tracer.traced("copy_to_clipboard")
 def copy_to_clipboard(text: str):
     if config.COPY_TO_CLIPBOARD:
         pyperclip.copy(text)
         logger.info("Text copied to clipboard.")
 
 
+@tracer.traced("tts")
 def tts_transcript(transcript: str):
+    # Imported here because tts depends on this module through output_sink
+    from voice_action_assistant.tts import SPEECH_SAMPLE_RATE, MixerPlayer, synthesize
+
     try:
-        openai_client = init_client()
-        speech_file_path = Path(__file__).parent / "response.mp3"
-        response = openai_client.audio.speech.create(
-            model="tts-1",
-            voice="alloy",
-            input=transcript,
-        )
-
-        response.stream_to_file(speech_file_path)
-        speed_up_audio("response.mp3", speed=config.AUDIO_SPEED)
-        mixer.music.load("response.mp3")
-        mixer.music.play()
-        import time
-
-        while mixer.music.get_busy():
-            time.sleep(0.1)
-
-        # Unload the current music
-        mixer.music.unload()
+        player = MixerPlayer()
+        player.enqueue(synthesize(transcript), SPEECH_SAMPLE_RATE)
+        player.wait()
     except Exception as e:
         logger.exception(f"Error with text-to-speech engine: {e}")
     logger.info("Response spoken.")
 
 
 def stt_audio_file(file_name: str):
-    openai_client = init_client()
+    openai_client = get_client()
     with open(file_name, "rb") as f:
         transcript = openai_client.audio.transcriptions.create(model="whisper-1", file=f)
     transcript_text = transcript.text
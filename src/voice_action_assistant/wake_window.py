@@ -0,0 +1,164 @@
+import time
+from collections import deque
+from collections.abc import Iterable
+from threading import Lock
+from typing import NamedTuple
+
+from loguru import logger
+
+from voice_action_assistant.config import config
+from voice_action_assistant.matcher import tokenize
+from voice_action_assistant.recorder import AudioDetector, AudioRecorder
+
+# A slow speaking pace, so the context sized from a phrase always holds the whole phrase
+SECONDS_PER_WORD = 0.5
+
+
+def phrase_seconds(phrase: str) -> float:
+    """Upper estimate of how long `phrase` takes to say."""
+    return len(tokenize(phrase)) * SECONDS_PER_WORD
+
+
+class Utterance(NamedTuple):
+    start: int  # Stream positions in the wake recorder's buffer
+    end: int
+    transcript: str
+    # perf_counter() times of the decode that produced it, for tracing
+    decode_started_at: float = 0.0
+    decode_finished_at: float = 0.0
+
+
+class _Segment(NamedTuple):
+    start: int
+    end: int
+    words: list[str]
+
+
+def merge_overlap(previous: list[str], new: list[str], max_overlap: int = 8) -> list[str]:
+    """
+    Return the words of `new` that are not already at the end of `previous`.
+
+    A segment is decoded with some context audio before its new audio, so its first words
+    usually repeat the last words of the previous segment. The longest suffix of `previous`
+    that is also a prefix of `new` (compared as normalised tokens) is dropped from `new`.
+    """
+    previous_tokens = [" ".join(tokenize(word)) for word in previous[-max_overlap:]]
+    new_tokens = [" ".join(tokenize(word)) for word in new]
+    for overlap in range(min(len(previous_tokens), len(new_tokens)), 0, -1):
+        if previous_tokens[-overlap:] == new_tokens[:overlap]:
+            return new[overlap:]
+    return new
+
+
+class WakeWindowTranscriber:
+    """
+    Transcribes the wake window for each stream position, without re-decoding the whole window.
+
+    In full window mode every hop re-decodes the whole window, so with a 3 s window and 0.5 s
+    hops each piece of audio goes through the model six times. In incremental mode only the
+    audio since the last decode is transcribed, once at least `min_new_seconds` of it has
+    arrived, together with `context_seconds` of audio before it. The context is as long as the
+    longest phrase (see `fit_context`), so a phrase that ends in the new audio is decoded, and
+    seen by the VAD and keyword spotter, in one piece even when it started before the last
+    decode; a word cut at that boundary is heard whole the second time. Each sample is decoded
+    (context + new) / new times, 4 for a three word phrase and 0.5 s hops. The repeated context
+    words are merged away and the transcript of the window is stitched from the segments that
+    overlap it.
+
+    `consume` marks the audio up to a position as used by an action. Segments overlapping it are
+    forgotten, so the phrase that triggered the action cannot match again.
+    """
+
+    def __init__(
+        self,
+        recorder: AudioRecorder,
+        detector: AudioDetector,
+        window_seconds: float | None = None,
+        incremental: bool = config.WAKE_INCREMENTAL_DECODING,
+        context_seconds: float | None = config.WAKE_CONTEXT_SECONDS,
+        min_new_seconds: float = config.WAKE_MIN_NEW_AUDIO_SECONDS,
+    ):
+        self.recorder = recorder
+        self.detector = detector
+        self.window_samples = int((window_seconds or recorder.max_seconds) * recorder.fs)
+        self.incremental = incremental
+        self.min_new_samples = int(min_new_seconds * recorder.fs)
+        # None sizes the context from the phrases, once they are known
+        self.fixed_context = context_seconds is not None
+        self.context_samples = int((context_seconds or 0) * recorder.fs)
+
+        self.consumed_position = 0
+        self.decoded_end = 0
+        self.segments: deque[_Segment] = deque()
+        self.started_at = time.perf_counter()
+        self._lock = Lock()
+
+    def fit_context(self, phrases: Iterable[str]):
+        """Make the context at least as long as the longest phrase, unless it was set."""
+        if self.fixed_context:
+            return
+        longest = max((phrase_seconds(phrase) for phrase in phrases), default=0.0)
+        max_context = self.window_samples - self.min_new_samples
+        self.context_samples = min(int(longest * self.recorder.fs), max_context)
+        logger.debug(f"Wake context: {self.context_samples / self.recorder.fs:0.2f} seconds")
+
+    @property
+    def decoded_seconds_per_second(self) -> float:
+        """Seconds of audio sent to the model per second of wall-clock time."""
+        elapsed = time.perf_counter() - self.started_at
+        decoded_seconds = self.detector.decoded_samples / self.recorder.fs
+        return decoded_seconds / elapsed if elapsed > 0 else 0.0
+
+    def consume(self, position: int):
+        with self._lock:
+            self.consumed_position = max(self.consumed_position, position)
+            self.decoded_end = max(self.decoded_end, position)
+            self.segments.clear()
+
+    def transcribe(self, position: int) -> Utterance | None:
+        with self._lock:
+            window_start = max(position - self.window_samples, self.consumed_position)
+            if self.incremental:
+                if position - self.decoded_end < self.min_new_samples:
+                    return None
+                start = max(self.decoded_end - self.context_samples, window_start)
+            else:
+                start = window_start
+            consumed_position = self.consumed_position
+
+        if position - start < self.detector.min_window_samples:
+            return None
+        decode_started_at = time.perf_counter()
+        audio = self.recorder.signal_buffer.read(start, position)
+        transcript = self.detector.transcribe_window(audio)
+        decode_times = (decode_started_at, time.perf_counter())
+
+        with self._lock:
+            if self.consumed_position != consumed_position:
+                return None  # An action consumed this audio while it was being decoded
+            if not self.incremental:
+                return (
+                    Utterance(start, position, transcript, *decode_times) if transcript else None
+                )
+            return self._merge(start, position, window_start, transcript, decode_times)
+
+    def _merge(
+        self,
+        start: int,
+        end: int,
+        window_start: int,
+        transcript: str,
+        decode_times: tuple[float, float] = (0.0, 0.0),
+    ) -> Utterance | None:
+        self.decoded_end = end
+        while self.segments and self.segments[0].end <= window_start:
+            self.segments.popleft()
+
+        previous = [word for segment in self.segments for word in segment.words]
+        words = merge_overlap(previous, transcript.split()) if transcript else []
+        self.segments.append(_Segment(start, end, words))
+        merged = " ".join(previous + words)
+        logger.debug(f"Wake window transcript: {merged}")
+        if not words:
+            return None  # Nothing new; the same text already went to the action controller
+        return Utterance(self.segments[0].start, end, merged, *decode_times)
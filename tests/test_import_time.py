@@ -0,0 +1,18 @@
+import os
+import sys
+
+from benchmarks.import_time import (
+    DEFERRED_MODULES,
+    ENTRY_MODULE,
+    IMPORT_BUDGET_MS,
+    measure_imports,
+)
+
+
+def test_entry_point_imports_within_budget_without_heavy_dependencies(monkeypatch):
+    # The fresh interpreter needs the same import path as the tests
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(sys.path))
+    imports = measure_imports(ENTRY_MODULE)
+
+    assert [name for name in DEFERRED_MODULES if name in imports] == []
+    assert imports[ENTRY_MODULE][1] / 1000 <= IMPORT_BUDGET_MS
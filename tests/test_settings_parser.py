@@ -0,0 +1,24 @@
+from voice_action_assistant.settings_parser import SettingsCommand, SettingsCommandParser
+
+parser = SettingsCommandParser()
+
+
+def test_values_keep_their_case_and_characters():
+    assert parser.parse("Set recordings archive dir to ~/Voice/Archive.") == SettingsCommand(
+        updates={"RECORDINGS_ARCHIVE_DIR": "~/Voice/Archive"}
+    )
+    assert parser.parse("Set the model ID to openai/whisper-Large") == SettingsCommand(
+        updates={"MODEL_ID": "openai/whisper-Large"}
+    )
+
+
+def test_typed_values_are_coerced():
+    assert parser.parse("Set audio speed to 1.5.").updates == {"AUDIO_SPEED": 1.5}
+    assert parser.parse("Set copy to clipboard to False.").updates == {"COPY_TO_CLIPBOARD": False}
+    assert parser.parse("Set recording format to Opus.").updates == {"RECORDING_FORMAT": "opus"}
+
+
+def test_unclear_commands_go_to_the_llm():
+    assert parser.parse("Turn off streaming transcription.") is None
+    assert parser.parse("Set audio files dir to none.") is None
+    assert parser.parse("Talk slower.") is None
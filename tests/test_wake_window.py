@@ -0,0 +1,86 @@
+import numpy as np
+
+from voice_action_assistant.audio_buffer import AudioRingBuffer
+from voice_action_assistant.matcher import PhraseMatcher, PhraseRole
+from voice_action_assistant.recorder import AudioDetector
+from voice_action_assistant.wake_window import WakeWindowTranscriber
+
+SAMPLE_RATE = 16000
+HOP = SAMPLE_RATE // 2
+WORDS = ["okay", "hi", "computer"]
+WORD_SAMPLES = int(0.4 * SAMPLE_RATE)
+GAP_SAMPLES = int(0.05 * SAMPLE_RATE)
+
+
+class StreamRecorder:
+    def __init__(self):
+        self.fs = SAMPLE_RATE
+        self.max_seconds = 3
+        self.signal_buffer = AudioRingBuffer(3 * SAMPLE_RATE)
+
+
+class WordTranscriber:
+    """Hears word i wherever the audio is (i + 1) / 10, and a cut word as its first letters."""
+
+    def transcribe_audio(self, audio: np.ndarray, pre_audio_file: str = "") -> str:
+        codes = np.rint(audio * 10).astype(int)
+        words = []
+        start = 0
+        while start < len(codes):
+            end = start
+            while end < len(codes) and codes[end] == codes[start]:
+                end += 1
+            if codes[start]:
+                word = WORDS[codes[start] - 1]
+                heard = round(len(word) * (end - start) / WORD_SAMPLES)
+                words.append(word[: max(heard, 1)])
+            start = end
+        return " ".join(words)
+
+
+class PhraseSpotter:
+    """Passes only audio that holds every word of the phrase in full."""
+
+    def detect(self, audio: np.ndarray) -> list[str]:
+        transcript = WordTranscriber().transcribe_audio(audio)
+        return ["okay hi computer"] if transcript.endswith("okay hi computer") else []
+
+
+def stream_with_phrase(phrase_start: float, seconds: float = 6.0) -> np.ndarray:
+    audio = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    position = int(phrase_start * SAMPLE_RATE)
+    for index in range(len(WORDS)):
+        audio[position : position + WORD_SAMPLES] = (index + 1) / 10
+        position += WORD_SAMPLES + GAP_SAMPLES
+    return audio
+
+
+def dispatched(audio: np.ndarray, spotter=None) -> list[str]:
+    recorder = StreamRecorder()
+    detector = AudioDetector(recorder, WordTranscriber(), spotter=spotter)
+    wake_window = WakeWindowTranscriber(
+        recorder, detector, incremental=True, context_seconds=None, min_new_seconds=0.5
+    )
+    wake_window.fit_context(["okay hi computer"])
+    matcher = PhraseMatcher()
+    matcher.add("action", PhraseRole.START, "okay hi computer")
+
+    transcripts = []
+    for start in range(0, len(audio) - HOP + 1, HOP):
+        recorder.signal_buffer.write(audio[start : start + HOP])
+        utterance = wake_window.transcribe(recorder.signal_buffer.total_written)
+        if utterance and matcher.match(utterance.transcript):
+            transcripts.append(utterance.transcript)
+            wake_window.consume(utterance.end)
+    return transcripts
+
+
+def test_phrase_split_across_two_hops_dispatches():
+    # "computer" runs from 4.25 to 4.65 s, across the decode at 4.5 s
+    transcripts = dispatched(stream_with_phrase(3.35))
+    assert len(transcripts) == 1
+    assert transcripts[0].endswith("okay hi computer")
+
+
+def test_keyword_spotter_sees_the_whole_split_phrase():
+    assert len(dispatched(stream_with_phrase(3.35), spotter=PhraseSpotter())) == 1